@@ -33,6 +33,11 @@ class AsyncSupabaseClient:
         func = partial(self.client.table(table_name).insert(data).execute)
         return await self.loop.run_in_executor(None, func)
     
+    async def table_upsert(self, table_name: str, data: Any, on_conflict: str = ""):
+        """Async wrapper for table upsert operations"""
+        func = partial(self.client.table(table_name).upsert(data, on_conflict=on_conflict).execute)
+        return await self.loop.run_in_executor(None, func)
+    
     async def table_update(self, table_name: str, data: Dict[str, Any], **filters):
         """Async wrapper for table update operations"""
         query = self.client.table(table_name).update(data)
@@ -42,6 +47,9 @@ class AsyncSupabaseClient:
             if key == "eq":
                 for field, val in value.items():
                     query = query.eq(field, val)
+            elif key == "in_":
+                for field, vals in value.items():
+                    query = query.in_(field, vals)
         
         func = partial(query.execute)
         return await self.loop.run_in_executor(None, func)
@@ -55,6 +63,9 @@ class AsyncSupabaseClient:
             if key == "eq":
                 for field, val in value.items():
                     query = query.eq(field, val)
+            elif key == "in_":
+                for field, vals in value.items():
+                    query = query.in_(field, vals)
             elif key == "single":
                 if value:
                     query = query.single()
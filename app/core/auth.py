@@ -4,7 +4,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional, Dict
 import logging
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 
 from .async_supabase import async_supabase_client
 from .cache import user_cache
@@ -131,8 +131,8 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(
                 "id": user_id,
                 "email": email,
                 "credits": 10,  # Default credits for new users
-                "created_at": datetime.utcnow().isoformat(),
-                "updated_at": datetime.utcnow().isoformat()
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "updated_at": datetime.now(timezone.utc).isoformat()
             }
             
             try:
@@ -194,7 +194,7 @@ async def deduct_user_credits(user_id: str, credits: int = 1) -> Dict:
         new_credits = current_credits - credits
         update_response = await async_supabase_client.table_update("users", {
             "credits": new_credits,
-            "updated_at": datetime.utcnow().isoformat()
+            "updated_at": datetime.now(timezone.utc).isoformat()
         }, eq={"id": user_id})
         
         # Invalidate user cache
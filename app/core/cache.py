@@ -1,18 +1,41 @@
 # app/core/cache.py
-from typing import Any, Optional, Dict, Tuple
+from typing import Any, Optional, Dict, List, Tuple
 import time
+import random
 import logging
 from functools import wraps
 import asyncio
 
 logger = logging.getLogger(__name__)
 
+# Active expiry, modelled on Redis: sample a few keys per cycle and keep going
+# only while a large share of the sample turns out to be expired
+EXPIRE_SAMPLE_SIZE = 20
+EXPIRE_REPEAT_RATIO = 0.25
+EXPIRE_TIME_BUDGET = 0.025  # seconds per cycle
+EXPIRE_CYCLE_INTERVAL = 0.1  # seconds between cycles
+
 class InMemoryCache:
     """Simple in-memory cache with TTL support"""
     
-    def __init__(self):
+    def __init__(self, max_size: Optional[int] = None):
         self._cache: Dict[str, Tuple[Any, float]] = {}
+        # Keys in an indexable slot array (plus each key's slot) so expiry can
+        # sample random keys without copying the whole key set
+        self._keys: List[str] = []
+        self._slots: Dict[str, int] = {}
         self._lock = asyncio.Lock()
+        self.max_size = max_size
+
+    def _remove(self, key: str):
+        """Delete a key from the cache and its slot array (caller holds the lock)"""
+        del self._cache[key]
+        slot = self._slots.pop(key)
+        last_key = self._keys.pop()
+        if last_key != key:
+            # Move the last key into the freed slot
+            self._keys[slot] = last_key
+            self._slots[last_key] = slot
     
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache if not expired"""
@@ -24,7 +47,7 @@ class InMemoryCache:
                     return value
                 else:
                     # Remove expired entry
-                    del self._cache[key]
+                    self._remove(key)
                     logger.debug(f"Cache expired for key: {key}")
             logger.debug(f"Cache miss for key: {key}")
             return None
@@ -33,6 +56,13 @@ class InMemoryCache:
         """Set value in cache with TTL (default 5 minutes)"""
         async with self._lock:
             expiry = time.time() + ttl
+            if self.max_size and key not in self._cache and len(self._cache) >= self.max_size:
+                # Evict the oldest entry (dicts preserve insertion order)
+                oldest_key = next(iter(self._cache))
+                self._remove(oldest_key)
+            if key not in self._cache:
+                self._slots[key] = len(self._keys)
+                self._keys.append(key)
             self._cache[key] = (value, expiry)
             logger.debug(f"Cached key: {key} with TTL: {ttl}s")
     
@@ -40,13 +70,15 @@ class InMemoryCache:
         """Delete key from cache"""
         async with self._lock:
             if key in self._cache:
-                del self._cache[key]
+                self._remove(key)
                 logger.debug(f"Deleted cache key: {key}")
     
     async def clear(self):
         """Clear all cache entries"""
         async with self._lock:
             self._cache.clear()
+            self._keys.clear()
+            self._slots.clear()
             logger.debug("Cleared all cache entries")
     
     async def cleanup_expired(self):
@@ -58,12 +90,41 @@ class InMemoryCache:
                 if current_time >= expiry
             ]
             for key in expired_keys:
-                del self._cache[key]
+                self._remove(key)
             if expired_keys:
                 logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
 
-# Global cache instance
+    async def expire_sample(self) -> int:
+        """
+        Remove expired entries by random sampling instead of a full scan.
+        Returns the number of entries removed.
+        """
+        async with self._lock:
+            if not self._cache:
+                return 0
+            start = time.monotonic()
+            removed = 0
+            while self._keys:
+                now = time.time()
+                # Sample slot numbers, then resolve them to keys before removing anything
+                slots = random.sample(range(len(self._keys)), min(EXPIRE_SAMPLE_SIZE, len(self._keys)))
+                sample = [self._keys[slot] for slot in slots]
+                expired = 0
+                for key in sample:
+                    if now >= self._cache[key][1]:
+                        self._remove(key)
+                        expired += 1
+                removed += expired
+                if expired / len(sample) < EXPIRE_REPEAT_RATIO or time.monotonic() - start > EXPIRE_TIME_BUDGET:
+                    break
+            if removed:
+                logger.debug(f"Expired {removed} cache entries by sampling")
+            return removed
+
+# Global cache instances
 user_cache = InMemoryCache()
+llm_response_cache = InMemoryCache(max_size=5000)
+menu_extraction_cache = InMemoryCache(max_size=1000)
 
 def cache_user_data(ttl: int = 300):
     """Decorator to cache user data"""
@@ -91,12 +152,13 @@ def cache_user_data(ttl: int = 300):
 
 # Background task to periodically clean up expired entries
 async def cache_cleanup_task():
-    """Periodically clean up expired cache entries"""
+    """Periodically expire cache entries by sampling; reads also expire entries lazily"""
     while True:
         try:
-            await asyncio.sleep(600)  # Run every 10 minutes
-            await user_cache.cleanup_expired()
+            await asyncio.sleep(EXPIRE_CYCLE_INTERVAL)
+            for cache in (user_cache, llm_response_cache, menu_extraction_cache):
+                await cache.expire_sample()
         except Exception as e:
             logger.error(f"Error in cache cleanup task: {str(e)}")
 
-__all__ = ["user_cache", "cache_user_data", "cache_cleanup_task"]
\ No newline at end of file
+__all__ = ["user_cache", "llm_response_cache", "menu_extraction_cache", "cache_user_data", "cache_cleanup_task"]
\ No newline at end of file
@@ -0,0 +1,40 @@
+# app/core/config.py
+from functools import lru_cache
+from typing import List, Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """Application settings, read once from the environment (and .env) at startup"""
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore", frozen=True)
+
+    # Required
+    SUPABASE_URL: str
+    SUPABASE_ANON_KEY: str
+    OPENAI_API_KEY: str
+
+    # Optional - Google image search is skipped when these are not set
+    GOOGLE_CSE_API_KEY: Optional[str] = None
+    GOOGLE_CSE_ID: Optional[str] = None
+
+    PORT: int = 8000
+    ENVIRONMENT: str = "production"
+
+    # Comma-separated list of origins allowed by CORS; "*" allows any origin
+    ALLOWED_ORIGINS: str = "*"
+
+    @property
+    def allowed_origins_list(self) -> List[str]:
+        """ALLOWED_ORIGINS split into a list"""
+        return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",") if origin.strip()]
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """Return the cached settings instance; raises if required variables are missing"""
+    return Settings()
+
+
+__all__ = ["Settings", "get_settings"]
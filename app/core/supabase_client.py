@@ -1,5 +1,6 @@
 # app/core/supabase_client.py
 from supabase import create_client, Client
+import atexit
 import os
 import logging
 from typing import Optional
@@ -10,15 +11,17 @@ logger = logging.getLogger(__name__)
 # Don't initialize at module level
 _supabase_client: Optional[Client] = None
 _http_client: Optional[httpx.AsyncClient] = None
+_supabase_rest_client: Optional[httpx.AsyncClient] = None
+_shared_httpx: Optional[httpx.Client] = None
 
 def get_http_client() -> httpx.AsyncClient:
     """Get or create HTTP client with connection pooling"""
     global _http_client
     
     if _http_client is None:
-        # Configure connection pooling
+        # Configure connection pooling (shared by all OpenAI clients)
         limits = httpx.Limits(
-            max_keepalive_connections=20,  # Number of connections to keep alive
+            max_keepalive_connections=50,  # Number of connections to keep alive
             max_connections=100,           # Maximum number of connections
             keepalive_expiry=30.0         # How long to keep connections alive (seconds)
         )
@@ -61,6 +64,66 @@ def get_supabase_client() -> Client:
     
     return _supabase_client
 
+def create_supabase_rest_client() -> httpx.AsyncClient:
+    """Create an async HTTP client for calling the Supabase REST API directly"""
+    supabase_url = os.getenv("SUPABASE_URL")
+    supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_ANON_KEY")
+    
+    if not supabase_url or not supabase_key:
+        logger.error("Supabase credentials not found in environment variables")
+        raise ValueError("Supabase credentials not configured")
+    
+    return httpx.AsyncClient(
+        base_url=supabase_url,
+        headers={
+            "apikey": supabase_key,
+            "Authorization": f"Bearer {supabase_key}"
+        },
+        limits=httpx.Limits(max_keepalive_connections=20),
+        http2=True
+    )
+
+def get_supabase_rest_client() -> httpx.AsyncClient:
+    """Get or create the shared async Supabase REST client"""
+    global _supabase_rest_client
+    
+    if _supabase_rest_client is None:
+        _supabase_rest_client = create_supabase_rest_client()
+        logger.info("Initialized async Supabase REST client")
+    
+    return _supabase_rest_client
+
+def get_shared_httpx() -> httpx.Client:
+    """Get or create a pooled sync HTTP client for Supabase REST calls from scripts and threads"""
+    global _shared_httpx
+    
+    if _shared_httpx is None:
+        supabase_url = os.getenv("SUPABASE_URL")
+        supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_ANON_KEY")
+        
+        if not supabase_url or not supabase_key:
+            logger.error("Supabase credentials not found in environment variables")
+            raise ValueError("Supabase credentials not configured")
+        
+        _shared_httpx = httpx.Client(
+            base_url=supabase_url,
+            headers={
+                "apikey": supabase_key,
+                "Authorization": f"Bearer {supabase_key}"
+            },
+            limits=httpx.Limits(
+                max_connections=16,
+                max_keepalive_connections=16,
+                keepalive_expiry=60.0
+            ),
+            timeout=30.0,
+            http2=True  # Multiplex concurrent script requests over few TLS connections
+        )
+        atexit.register(_shared_httpx.close)
+        logger.info("Initialized shared sync HTTP client")
+    
+    return _shared_httpx
+
 # For backward compatibility, create a property that initializes on first access
 class SupabaseClientProxy:
     @property
@@ -85,10 +148,22 @@ supabase_client = SupabaseClientProxy()
 # Cleanup function for graceful shutdown
 async def close_connections():
     """Close HTTP client connections on application shutdown"""
-    global _http_client
+    global _http_client, _supabase_rest_client
     if _http_client:
         await _http_client.aclose()
         _http_client = None
         logger.info("Closed HTTP client connections")
+    if _supabase_rest_client:
+        await _supabase_rest_client.aclose()
+        _supabase_rest_client = None
+        logger.info("Closed Supabase REST client connections")
 
-__all__ = ["supabase_client", "get_supabase_client", "close_connections"]
\ No newline at end of file
+__all__ = [
+    "supabase_client",
+    "get_supabase_client",
+    "get_http_client",
+    "create_supabase_rest_client",
+    "get_supabase_rest_client",
+    "get_shared_httpx",
+    "close_connections"
+]
\ No newline at end of file
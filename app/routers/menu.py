@@ -3,26 +3,27 @@ from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status,
 from typing import Dict, List, Optional
 import logging
 import asyncio
-from datetime import datetime
+from datetime import datetime, timezone
 import uuid
 import os
-import json
 
 from app.core.auth import get_current_user, verify_user_credits, deduct_user_credits
 from app.services.image_processor import process_and_optimize_image, validate_image_file
 from app.services.openai_service import extract_menu_items
 from app.services.google_search_service import search_images_batch
 from app.services.dalle_service import get_fallback_image, generate_images_batch
-from app.services.semantic_search_service import search_dishes_batch, log_missing_dish
+from app.services.semantic_search_service import search_dishes_batch, log_missing_dishes_batch
 from app.core.async_supabase import async_supabase_client
 from app.models.menu import MenuResponse, MenuItem
 from app.services.progress_tracker import progress_tracker
+from app.utils.currency_detector import detect_currency_comprehensive
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 # Maximum file size: 10MB
 MAX_FILE_SIZE = 10 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 64 * 1024
 
 # Test mode flag - set via environment variable
 TEST_MODE = os.getenv("TEST_MODE", "false").lower() == "true"
@@ -102,7 +103,7 @@ async def upload_menu(
 ):
     """Upload and process a menu image"""
     
-    start_time = datetime.utcnow()
+    start_time = datetime.now(timezone.utc)
     logger.info(f"Starting menu upload for user {current_user['id']}")
     
     # Validate file type
@@ -112,16 +113,19 @@ async def upload_menu(
             detail="Invalid file type. Please upload an image file."
         )
     
-    # Check file size
-    contents = await menu.read()
-    if len(contents) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File too large. Maximum size is 10MB."
-        )
+    # Read the upload in chunks, rejecting it as soon as it exceeds the size limit
+    buffer = bytearray()
+    while chunk := await menu.read(UPLOAD_CHUNK_SIZE):
+        buffer.extend(chunk)
+        if len(buffer) > MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="File too large. Maximum size is 10MB."
+            )
+    contents = bytes(buffer)
     
     # Validate image file format
-    if not validate_image_file(contents):
+    if not await asyncio.to_thread(validate_image_file, contents):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid image file. Please upload a valid image format (JPEG, PNG, GIF, etc.)."
@@ -144,7 +148,7 @@ async def upload_menu(
             "user_id": current_user["id"],
             "status": "processing",
             "title": "Uploaded Menu",
-            "processed_at": datetime.utcnow().isoformat()
+            "processed_at": datetime.now(timezone.utc).isoformat()
         })
         
         logger.info(f"Created menu record {menu_id} for user {current_user['id']}")
@@ -181,18 +185,18 @@ async def upload_menu(
             # Normal mode: process image and extract items
             logger.info(f"Processing image for menu {menu_id}")
             await progress_tracker.update_progress(menu_id, "image_processing", 10)
-            process_start = datetime.utcnow()
-            base64_image = await process_and_optimize_image(contents)
-            process_time = (datetime.utcnow() - process_start).total_seconds()
+            process_start = datetime.now(timezone.utc)
+            base64_image, image_hash = await process_and_optimize_image(contents)
+            process_time = (datetime.now(timezone.utc) - process_start).total_seconds()
             logger.info(f"Image processing completed in {process_time:.2f}s")
             await progress_tracker.update_progress(menu_id, "image_processed", 20)
 
             # Extract menu items using OpenAI
             logger.info(f"Extracting menu items for menu {menu_id}")
             await progress_tracker.update_progress(menu_id, "extracting_menu", 25)
-            extraction_start = datetime.utcnow()
-            extraction_result = await extract_menu_items(base64_image)
-            extraction_time = (datetime.utcnow() - extraction_start).total_seconds()
+            extraction_start = datetime.now(timezone.utc)
+            extraction_result = await extract_menu_items(base64_image, image_hash=image_hash)
+            extraction_time = (datetime.now(timezone.utc) - extraction_start).total_seconds()
             extracted_items = extraction_result.get("items", [])
             logger.info(
                 f"Menu extraction completed in {extraction_time:.2f}s, found {len(extracted_items) if extracted_items else 0} items"
@@ -200,6 +204,19 @@ async def upload_menu(
 
         extracted_items = extraction_result.get("items", [])
 
+        # Resolve the menu currency once and reuse it for every item
+        menu_currency = extraction_result.get("currency")
+        if not menu_currency and extracted_items:
+            menu_currency = detect_currency_comprehensive(
+                restaurant_name=extraction_result.get("restaurant_name"),
+                price_strings=[
+                    str(item.get("original_price_text") or item.get("price") or "")
+                    for item in extracted_items
+                ]
+            )
+        menu_currency = menu_currency or "USD"
+        logger.info(f"Using currency {menu_currency} for menu {menu_id}")
+
         menu_title = resolve_menu_title(extraction_result, extracted_items)
         logger.info(f"Resolved menu title for {menu_id}: {menu_title}")
         try:
@@ -217,7 +234,7 @@ async def upload_menu(
                     "name": item_name,
                     "description": item.get("description"),
                     "price": item.get("price"),
-                    "currency": item.get("currency", extraction_result.get("currency", "USD")),
+                    "currency": item.get("currency") or menu_currency,
                     "order_index": index
                 })
 
@@ -256,7 +273,7 @@ async def upload_menu(
                 "item_name": item["name"],
                 "description": item.get("description"),
                 "price": item.get("price"),
-                "currency": item.get("currency", "USD"),  # Use detected currency or default to USD
+                "currency": item.get("currency") or menu_currency,
                 "order_index": index
             }
             menu_item_records.append((menu_item_id, menu_item_data, item))
@@ -322,16 +339,15 @@ async def upload_menu(
             image_results = {}
 
             # Track start time for overall image search
-            semantic_start = datetime.utcnow()
+            semantic_start = datetime.now(timezone.utc)
 
             if DISABLE_SEMANTIC_SEARCH:
                 logger.info(f"Semantic search disabled - using Google search for all {len(items_for_processing)} items")
                 items_needing_google = items_for_processing
 
                 # Log all items to items_without_pictures since we're not searching the database
-                for item in items_for_processing:
-                    await log_missing_dish(item['name'], item.get('description'))
-                    logger.info(f"Logged '{item['name']}' to items_without_pictures (semantic search disabled)")
+                await log_missing_dishes_batch(items_for_processing)
+                logger.info(f"Logged {len(items_for_processing)} items to items_without_pictures (semantic search disabled)")
 
                 await progress_tracker.update_progress(menu_id, "semantic_skipped", 60)
             else:
@@ -340,7 +356,7 @@ async def upload_menu(
 
                 semantic_results = await search_dishes_batch(items_for_processing, top_k=1)
 
-                semantic_time = (datetime.utcnow() - semantic_start).total_seconds()
+                semantic_time = (datetime.now(timezone.utc) - semantic_start).total_seconds()
                 logger.info(f"Semantic search completed in {semantic_time:.2f}s")
 
                 # Separate items into those with semantic matches and those needing fallback
@@ -370,11 +386,11 @@ async def upload_menu(
             if items_needing_google:
                 logger.info(f"Phase 2: Starting Google search for {len(items_needing_google)} items")
                 await progress_tracker.update_progress(menu_id, "google_search", 70)
-                google_start = datetime.utcnow()
+                google_start = datetime.now(timezone.utc)
 
                 google_results = await search_images_batch(items_needing_google, limit_per_item=3)
 
-                google_time = (datetime.utcnow() - google_start).total_seconds()
+                google_time = (datetime.now(timezone.utc) - google_start).total_seconds()
                 logger.info(f"Google search completed in {google_time:.2f}s")
 
                 # Separate items with Google results from those needing DALL-E
@@ -401,11 +417,11 @@ async def upload_menu(
                 if items_needing_dalle:
                     logger.info(f"Phase 3: Generating images with DALL-E for {len(items_needing_dalle)} items")
                     await progress_tracker.update_progress(menu_id, "dalle_generation", 78)
-                    dalle_start = datetime.utcnow()
+                    dalle_start = datetime.now(timezone.utc)
 
                     dalle_results = await generate_images_batch(items_needing_dalle, limit_per_item=1)
 
-                    dalle_time = (datetime.utcnow() - dalle_start).total_seconds()
+                    dalle_time = (datetime.now(timezone.utc) - dalle_start).total_seconds()
                     logger.info(f"DALL-E generation completed in {dalle_time:.2f}s")
 
                     # Add DALL-E results
@@ -421,7 +437,7 @@ async def upload_menu(
                             image_results[item_id] = []
                             logger.warning(f"✗ All sources failed for '{item['name']}'")
 
-            search_time = (datetime.utcnow() - semantic_start).total_seconds()
+            search_time = (datetime.now(timezone.utc) - semantic_start).total_seconds()
             logger.info(f"Total image acquisition completed in {search_time:.2f}s")
 
         # Process results and prepare image records
@@ -515,7 +531,7 @@ async def upload_menu(
         # Mark progress as complete
         await progress_tracker.complete_task(menu_id, success=True)
         
-        total_time = (datetime.utcnow() - start_time).total_seconds()
+        total_time = (datetime.now(timezone.utc) - start_time).total_seconds()
         logger.info(f"Successfully processed menu {menu_id} with {len(menu_items)} items in {total_time:.2f}s")
         
         return MenuResponse(
@@ -531,7 +547,7 @@ async def upload_menu(
         await progress_tracker.complete_task(menu_id, success=False)
         raise
     except Exception as e:
-        total_time = (datetime.utcnow() - start_time).total_seconds()
+        total_time = (datetime.now(timezone.utc) - start_time).total_seconds()
         logger.error(f"Error processing menu {menu_id} after {total_time:.2f}s: {str(e)}", exc_info=True)
         
         # Mark progress as failed
@@ -630,7 +646,7 @@ async def get_user_menus(
     try:
         menus_response = await async_supabase_client.table_select(
             "menus",
-            "*, menu_items(count)",
+            "id, status, processed_at, title, menu_items(count)",
             eq={"user_id": current_user["id"]},
             order={"processed_at": True}
         )
@@ -5,7 +5,9 @@ import logging
 from pydantic import BaseModel
 
 from app.core.auth import get_current_user
-from app.services.translation_service import translate_menu_items
+from app.core.async_supabase import async_supabase_client
+from app.services.translation_service import LANGUAGE_MAP, translate_menu_items
+from app.services.translation_batch import get_stored_translations, submit_menu_translation_batch
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -29,13 +31,36 @@ async def translate_menu(
     
     try:
         # Validate target language
-        supported_languages = ["en", "fr", "de", "es", "it", "pt", "ja", "ko", "zh", "ar", "hi", "ru"]
+        supported_languages = list(LANGUAGE_MAP)
         if request.target_language not in supported_languages:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Unsupported language: {request.target_language}. Supported: {', '.join(supported_languages)}"
             )
         
+        # Serve pre-translated items from the database when a batch job already covered them
+        item_ids = [item.get("id") for item in request.items]
+        if request.target_language != "en" and all(item_ids):
+            # Best-effort lookup: any failure (e.g. missing table, non-UUID ids) falls back to live translation
+            try:
+                stored = await get_stored_translations(item_ids, request.target_language)
+            except Exception as e:
+                logger.warning(f"Stored translation lookup failed: {str(e)}")
+                stored = {}
+            if stored and len(stored) == len(set(item_ids)):
+                logger.info(f"Serving {len(stored)} stored {request.target_language} translations")
+                translated_items = []
+                for item in request.items:
+                    translated_item = item.copy()
+                    translated_item["name"] = stored[item["id"]]["name"]
+                    translated_item["description"] = stored[item["id"]]["description"]
+                    translated_items.append(translated_item)
+                return TranslateMenuResponse(
+                    success=True,
+                    items=translated_items,
+                    target_language=request.target_language
+                )
+        
         # Translate items
         translated_items = await translate_menu_items(
             items=request.items,
@@ -56,4 +81,46 @@ async def translate_menu(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to translate menu items"
-        )
\ No newline at end of file
+        )
+
+@router.post("/pretranslate-menu/{menu_id}")
+async def pretranslate_menu(
+    menu_id: str,
+    current_user: Dict = Depends(get_current_user)
+):
+    """Queue a Batch API job translating a menu into all supported languages"""
+    
+    try:
+        menu_response = await async_supabase_client.table_select(
+            "menus",
+            "id, menu_items(id, item_name, description)",
+            eq={"id": menu_id, "user_id": current_user["id"]},
+            single=True
+        )
+        
+        if not menu_response.data:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Menu not found"
+            )
+        
+        items = [
+            {"id": item["id"], "name": item["item_name"], "description": item["description"]}
+            for item in menu_response.data.get("menu_items", [])
+        ]
+        batch_id = await submit_menu_translation_batch(menu_id, items)
+        
+        return {
+            "success": True,
+            "menu_id": menu_id,
+            "batch_id": batch_id
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Pre-translation error for menu {menu_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to queue menu translation"
+        )
@@ -2,7 +2,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import Dict
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 
 from app.core.auth import get_current_user
 from app.core.async_supabase import async_supabase_client
@@ -45,7 +45,7 @@ async def update_user_profile(
     
     try:
         # Add updated_at timestamp
-        update_data["updated_at"] = datetime.utcnow().isoformat()
+        update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
         
         response = await async_supabase_client.table_update("users", update_data, eq={"id": current_user["id"]})
         
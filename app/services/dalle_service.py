@@ -7,14 +7,14 @@ import asyncio
 from typing import List, Optional, Dict, Tuple
 from openai import AsyncOpenAI
 from slugify import slugify
-from app.core.supabase_client import get_supabase_client
+from app.core.supabase_client import get_supabase_client, get_http_client
 import time
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Initialize OpenAI client on the shared keep-alive connection pool
+client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=get_http_client())
 
 # Supabase storage bucket name
 MENU_IMAGES_BUCKET = os.getenv("SUPABASE_BUCKET_MENU_IMAGES", "menu-images")
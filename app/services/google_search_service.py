@@ -1,5 +1,4 @@
 # app/services/google_search_service.py
-from googleapiclient.discovery import build
 import os
 import re
 import logging
@@ -9,7 +8,9 @@ from typing import List, Optional, Dict, Tuple, Set
 from urllib.parse import urlparse
 from io import BytesIO
 from PIL import Image
+import orjson
 
+from app.core.supabase_client import get_http_client
 from app.services.image_cache_service import (
     search_cached_images, 
     download_and_store_image,
@@ -22,6 +23,9 @@ logger = logging.getLogger(__name__)
 GOOGLE_CSE_API_KEY = os.getenv("GOOGLE_CSE_API_KEY")
 GOOGLE_CSE_ID = os.getenv("GOOGLE_CSE_ID")
 
+# Custom Search JSON API endpoint
+CSE_ENDPOINT = "https://www.googleapis.com/customsearch/v1"
+
 # High-quality food sites for better image results
 FOOD_DOMAINS = [
     "wolt.com",  # Food delivery platform with restaurant photos - prioritized
@@ -176,10 +180,8 @@ async def cse_image_search(query: str, domain: str = None, num: int = 3,
         return []
     
     try:
-        # Build service synchronously (googleapiclient doesn't support async)
-        service = build("customsearch", "v1", developerKey=GOOGLE_CSE_API_KEY)
-        
         params = {
+            "key": GOOGLE_CSE_API_KEY,
             "q": query,
             "cx": GOOGLE_CSE_ID,
             "searchType": "image",
@@ -194,12 +196,10 @@ async def cse_image_search(query: str, domain: str = None, num: int = 3,
             params["siteSearch"] = domain
             params["siteSearchFilter"] = "i"
         
-        # Execute search in thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            None,
-            lambda: service.cse().list(**params).execute()
-        )
+        # Call the REST endpoint directly on the shared pooled client
+        response = await get_http_client().get(CSE_ENDPOINT, params=params)
+        response.raise_for_status()
+        result = orjson.loads(response.content)
         
         return result.get("items", [])
         
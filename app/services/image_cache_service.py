@@ -6,7 +6,7 @@ import logging
 from typing import List, Optional, Dict, Tuple
 from io import BytesIO
 from PIL import Image
-from datetime import datetime
+from datetime import datetime, timezone
 import re
 
 from app.core.async_supabase import async_supabase_client
@@ -277,7 +277,7 @@ async def download_and_store_image(image_url: str, item_name: str,
             'file_size': len(optimized_data),
             'image_width': image_width,
             'image_height': image_height,
-            'created_at': datetime.utcnow().isoformat(),
+            'created_at': datetime.now(timezone.utc).isoformat(),
             'is_active': True
         }
 
@@ -1,5 +1,6 @@
 # app/services/image_processor.py
 from PIL import Image
+import asyncio
 import io
 import base64
 import logging
@@ -12,41 +13,45 @@ MAX_WIDTH = 1920
 MAX_HEIGHT = 1080
 # JPEG quality for optimization
 JPEG_QUALITY = 85
+# Perceptual hash grid size (hash_size * hash_size bits)
+HASH_SIZE = 16
 
-async def process_and_optimize_image(image_bytes: bytes) -> str:
+async def process_and_optimize_image(image_bytes: bytes) -> Tuple[str, str]:
     """
     Process and optimize image for OpenAI API
-    Returns base64 encoded image string
+    Returns base64 encoded image string and a perceptual hash of the image
     """
+    # Decoding, resizing and re-encoding are CPU-bound; keep them off the event loop
+    return await asyncio.to_thread(_process_image_sync, image_bytes)
+
+def _process_image_sync(image_bytes: bytes) -> Tuple[str, str]:
+    """Synchronous Pillow pipeline behind process_and_optimize_image"""
     try:
-        # Open image
-        image = Image.open(io.BytesIO(image_bytes))
-        
-        # Convert RGBA to RGB if necessary
-        if image.mode in ('RGBA', 'LA', 'P'):
-            # Create a white background
-            background = Image.new('RGB', image.size, (255, 255, 255))
-            if image.mode == 'P':
-                image = image.convert('RGBA')
-            background.paste(image, mask=image.split()[-1] if image.mode in ('RGBA', 'LA') else None)
-            image = background
-        elif image.mode not in ('RGB', 'L'):
-            image = image.convert('RGB')
-        
-        # Get current dimensions
-        width, height = image.size
-        logger.info(f"Original image size: {width}x{height}")
-        
-        # Calculate new dimensions if needed
-        if width > MAX_WIDTH or height > MAX_HEIGHT:
-            # Calculate scaling factor
-            scale = min(MAX_WIDTH / width, MAX_HEIGHT / height)
-            new_width = int(width * scale)
-            new_height = int(height * scale)
-            
-            # Resize image
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            logger.info(f"Resized image to: {new_width}x{new_height}")
+        with Image.open(io.BytesIO(image_bytes)) as source:
+            width, height = source.size
+            logger.info(f"Original image size: {width}x{height}")
+
+            # Let libjpeg decode at a reduced DCT scale close to the target size
+            # instead of decoding every pixel of a large photo and downscaling after
+            if source.format == "JPEG":
+                source.draft("RGB", (MAX_WIDTH, MAX_HEIGHT))
+
+            # Convert RGBA to RGB if necessary
+            if source.mode in ('RGBA', 'LA', 'P'):
+                # Create a white background
+                image = source.convert('RGBA') if source.mode == 'P' else source
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image, mask=image.split()[-1])
+                image = background
+            elif source.mode not in ('RGB', 'L'):
+                image = source.convert('RGB')
+            else:
+                image = source.copy()
+
+        # Downscale in place to fit within the maximum dimensions, keeping aspect ratio
+        if image.width > MAX_WIDTH or image.height > MAX_HEIGHT:
+            image.thumbnail((MAX_WIDTH, MAX_HEIGHT), Image.Resampling.LANCZOS)
+            logger.info(f"Resized image to: {image.width}x{image.height}")
         
         # Convert to JPEG for optimization
         output_buffer = io.BytesIO()
@@ -58,12 +63,28 @@ async def process_and_optimize_image(image_bytes: bytes) -> str:
         
         logger.info(f"Optimized image size: {len(base64_image)} bytes (base64)")
         
-        return base64_image
+        return base64_image, compute_dhash(image)
         
     except Exception as e:
         logger.error(f"Error processing image: {str(e)}")
         raise Exception(f"Failed to process image: {str(e)}")
 
+def compute_dhash(image: Image.Image, hash_size: int = HASH_SIZE) -> str:
+    """
+    Difference hash of an image as a hex string.
+    Re-encoded or slightly rescaled copies of the same photo differ in only a few bits.
+    """
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = list(small.getdata())
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+
+    return f"{value:0{hash_size * hash_size // 4}x}"
+
 def validate_image_file(file_bytes: bytes) -> bool:
     """Validate if the file is a valid image"""
     try:
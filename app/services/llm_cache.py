@@ -0,0 +1,95 @@
+# app/services/llm_cache.py
+import openai
+import hashlib
+import orjson
+import logging
+import os
+from typing import Dict, List, Optional
+
+from app.core.cache import llm_response_cache
+from app.core.supabase_client import get_http_client
+from app.services.openai_limits import openai_limiter, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Initialize OpenAI client on the shared keep-alive connection pool
+client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=get_http_client())
+
+# Responses above this temperature are too random to be worth reusing
+MAX_CACHEABLE_TEMPERATURE = 0.3
+
+# Log hit/miss counters every N lookups
+STATS_LOG_INTERVAL = 100
+
+_stats = {"hits": 0, "misses": 0}
+
+
+def make_cache_key(model: str, messages: List[Dict], temperature: float,
+                   response_format: Optional[Dict] = None, max_tokens: Optional[int] = None) -> str:
+    """Build a deterministic cache key for a chat completion request"""
+    payload = orjson.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "rf": response_format,
+            "max_tokens": max_tokens
+        },
+        option=orjson.OPT_SORT_KEYS
+    )
+    return "llm:" + hashlib.sha256(payload).hexdigest()
+
+
+def _record(hit: bool):
+    """Update hit/miss counters and log them periodically"""
+    _stats["hits" if hit else "misses"] += 1
+    total = _stats["hits"] + _stats["misses"]
+    if total % STATS_LOG_INTERVAL == 0:
+        logger.info(
+            f"LLM cache stats: {_stats['hits']} hits, {_stats['misses']} misses "
+            f"({_stats['hits'] / total:.0%} hit rate)"
+        )
+
+
+async def cached_chat(model: str, messages: List[Dict], temperature: float,
+                      response_format: Optional[Dict] = None, max_tokens: Optional[int] = None,
+                      ttl: int = 86400) -> str:
+    """
+    Run a chat completion, reusing the response for identical low-temperature requests.
+    Returns the message content of the first choice.
+    """
+    cacheable = temperature <= MAX_CACHEABLE_TEMPERATURE
+    cache_key = None
+
+    if cacheable:
+        cache_key = make_cache_key(model, messages, temperature, response_format, max_tokens)
+        cached_content = await llm_response_cache.get(cache_key)
+        _record(cached_content is not None)
+        if cached_content is not None:
+            return cached_content
+
+    request_kwargs = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature
+    }
+    if response_format is not None:
+        request_kwargs["response_format"] = response_format
+    if max_tokens is not None:
+        request_kwargs["max_tokens"] = max_tokens
+
+    async with openai_limiter.acquire(estimate_tokens(messages, max_tokens)):
+        raw_response = await client.chat.completions.with_raw_response.create(**request_kwargs)
+    openai_limiter.update_from_headers(raw_response.headers)
+    response = raw_response.parse()
+    content = response.choices[0].message.content
+
+    if cacheable and content:
+        await llm_response_cache.set(cache_key, content, ttl=ttl)
+
+    return content
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """Return a snapshot of the hit/miss counters"""
+    return dict(_stats)
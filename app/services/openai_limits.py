@@ -0,0 +1,104 @@
+# app/services/openai_limits.py
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default limits for chat completions
+MAX_REQUESTS_PER_MIN = 5000
+MAX_TOKENS_PER_MIN = 2_000_000
+MAX_CONCURRENT_REQUESTS = 50
+
+# Rough token cost of a high-detail image input when estimating request size
+IMAGE_TOKEN_ESTIMATE = 1500
+
+
+class OpenAILimiter:
+    """Concurrency cap plus request and token buckets for OpenAI API calls"""
+
+    def __init__(self, max_requests_per_min: int = MAX_REQUESTS_PER_MIN,
+                 max_tokens_per_min: int = MAX_TOKENS_PER_MIN,
+                 max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS):
+        self.max_requests_per_min = max_requests_per_min
+        self.max_tokens_per_min = max_tokens_per_min
+        self._semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self._lock = asyncio.Lock()
+        self._available_requests = float(max_requests_per_min)
+        self._available_tokens = float(max_tokens_per_min)
+        self._last_refill = time.monotonic()
+
+    def _refill(self):
+        """Top up both buckets for the time elapsed since the last refill"""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._available_requests = min(
+            self.max_requests_per_min,
+            self._available_requests + elapsed * self.max_requests_per_min / 60
+        )
+        self._available_tokens = min(
+            self.max_tokens_per_min,
+            self._available_tokens + elapsed * self.max_tokens_per_min / 60
+        )
+
+    async def _wait_for_capacity(self, estimated_tokens: int):
+        """Block until one request and estimated_tokens tokens are available, then take them"""
+        tokens = min(estimated_tokens, self.max_tokens_per_min)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._available_requests >= 1 and self._available_tokens >= tokens:
+                    self._available_requests -= 1
+                    self._available_tokens -= tokens
+                    return
+
+                sleep_time = max(
+                    (1 - self._available_requests) * 60 / self.max_requests_per_min,
+                    (tokens - self._available_tokens) * 60 / self.max_tokens_per_min,
+                    0.01
+                )
+                logger.info(f"OpenAI rate limit reached, waiting {sleep_time:.2f} seconds")
+                await asyncio.sleep(sleep_time)
+
+    @asynccontextmanager
+    async def acquire(self, estimated_tokens: int = 1000):
+        """Hold a concurrency slot and rate limit budget for one API call"""
+        async with self._semaphore:
+            await self._wait_for_capacity(estimated_tokens)
+            yield self
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """Shrink the local buckets to what OpenAI reports as remaining for this minute"""
+        remaining_requests = headers.get("x-ratelimit-remaining-requests")
+        remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+        try:
+            if remaining_requests is not None:
+                self._available_requests = min(self._available_requests, float(remaining_requests))
+            if remaining_tokens is not None:
+                self._available_tokens = min(self._available_tokens, float(remaining_tokens))
+        except ValueError:
+            logger.debug(f"Unparseable rate limit headers: {remaining_requests}, {remaining_tokens}")
+
+
+def estimate_tokens(messages: List[Dict], max_tokens: Optional[int] = None) -> int:
+    """Rough token estimate for a chat request (about 4 characters per token)"""
+    characters = 0
+    images = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            characters += len(content)
+        elif isinstance(content, list):
+            for part in content:
+                if part.get("type") == "text":
+                    characters += len(part.get("text", ""))
+                elif part.get("type") == "image_url":
+                    images += 1
+    return characters // 4 + images * IMAGE_TOKEN_ESTIMATE + (max_tokens or 0)
+
+
+# Shared limiter for all chat completion calls in this process
+openai_limiter = OpenAILimiter()
@@ -1,20 +1,76 @@
 # app/services/openai_service.py
 import openai
-import json
+import copy
+import orjson
 import logging
 import os
-from typing import Any, Dict, List, Optional
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
 import re
+from app.core.cache import menu_extraction_cache
+from app.services.openai_limits import openai_limiter, estimate_tokens
+from app.core.supabase_client import get_http_client
 from app.utils.currency_detector import detect_currency_comprehensive
-from app.services.translation_service import detect_language, translate_to_english_for_search
+from app.services.translation_service import detect_language, translate_batch_to_english_for_search
 
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-async def extract_menu_items(base64_image: str) -> Dict[str, Any]:
-    """Extract menu items and metadata from an image using GPT-4 Vision."""
+# Initialize OpenAI client on the shared keep-alive connection pool
+client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=get_http_client())
+
+# Re-uploaded menu photos reuse the previous extraction for this long (seconds)
+EXTRACTION_CACHE_TTL = 30 * 86400
+# Maximum differing hash bits for two images to count as the same photo
+NEAR_DUPLICATE_DISTANCE = 4
+# Hashes of recently extracted images, scanned for near-duplicate matches
+_recent_image_hashes: Deque[int] = deque(maxlen=1000)
+
+
+def _find_similar_hash(image_hash: int) -> Optional[int]:
+    """Return a recently extracted image hash within NEAR_DUPLICATE_DISTANCE bits, if any"""
+    if image_hash in _recent_image_hashes:
+        return image_hash
+    for recent_hash in _recent_image_hashes:
+        if bin(image_hash ^ recent_hash).count("1") <= NEAR_DUPLICATE_DISTANCE:
+            return recent_hash
+    return None
+
+
+async def extract_menu_items(base64_image: str, image_hash: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Extract menu items and metadata from an image using GPT-4 Vision.
+    When image_hash (a perceptual hash of the image) is given, results are reused
+    for the same or a near-identical photo instead of calling OpenAI again.
+    """
+    if not image_hash:
+        result, _ = await _extract_menu_items_uncached(base64_image)
+        return result
+
+    hash_value = int(image_hash, 16)
+    similar_hash = _find_similar_hash(hash_value)
+    if similar_hash is not None:
+        cached_result = await menu_extraction_cache.get(f"menu_extract:{similar_hash:x}")
+        if cached_result is not None:
+            logger.info(f"Reusing menu extraction for image hash {image_hash}")
+            # Callers mutate the returned items, so hand out a copy
+            return copy.deepcopy(cached_result)
+
+    result, complete = await _extract_menu_items_uncached(base64_image)
+
+    # Empty or degraded extractions are not replayed for later uploads of this photo
+    if result["items"] and complete:
+        await menu_extraction_cache.set(f"menu_extract:{hash_value:x}", copy.deepcopy(result), ttl=EXTRACTION_CACHE_TTL)
+        if hash_value not in _recent_image_hashes:
+            _recent_image_hashes.append(hash_value)
+
+    return result
+
+
+async def _extract_menu_items_uncached(base64_image: str) -> Tuple[Dict[str, Any], bool]:
+    """
+    Extract menu items and metadata from an image using GPT-4 Vision.
+    Returns the result and whether every step succeeded (safe to cache).
+    """
 
     prompt = """You are a menu extraction expert. Analyze this menu image and extract all menu items with their details.
 
@@ -74,43 +130,48 @@ Important:
 - Remove any special characters or formatting from item names
 """
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
+    messages = [
+        {
+            "role": "user",
+            "content": [
+                {
+                    "type": "text",
+                    "text": prompt
+                },
                 {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": prompt
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{base64_image}",
-                                "detail": "high"
-                            }
-                        }
-                    ]
+                    "type": "image_url",
+                    "image_url": {
+                        "url": f"data:image/jpeg;base64,{base64_image}",
+                        "detail": "high"
+                    }
                 }
-            ],
-            max_tokens=4096,
-            temperature=0.3,
-            response_format={"type": "json_object"}
-        )
+            ]
+        }
+    ]
+
+    try:
+        async with openai_limiter.acquire(estimate_tokens(messages, max_tokens=4096)):
+            raw_response = await client.chat.completions.with_raw_response.create(
+                model="gpt-4o-mini",
+                messages=messages,
+                max_tokens=4096,
+                temperature=0.3,
+                response_format={"type": "json_object"}
+            )
+        openai_limiter.update_from_headers(raw_response.headers)
+        response = raw_response.parse()
 
         # Parse the response
         content = response.choices[0].message.content
         logger.info(f"OpenAI raw response: {content[:200]}...")
 
         try:
-            data = json.loads(content)
-        except json.JSONDecodeError:
+            data = orjson.loads(content)
+        except orjson.JSONDecodeError:
             logger.error(f"Failed to parse JSON from OpenAI response: {content}")
             json_match = re.search(r'\{.*\}', content, re.DOTALL)
             if json_match:
-                data = json.loads(json_match.group())
+                data = orjson.loads(json_match.group())
             else:
                 raise ValueError("No valid JSON found in response")
 
@@ -172,19 +233,6 @@ Important:
             if item.get("description"):
                 cleaned_item["description"] = clean_text(item["description"])
 
-            if detected_language != "en":
-                english_data = await translate_to_english_for_search(
-                    cleaned_item["name"],
-                    cleaned_item.get("description")
-                )
-                cleaned_item["name_en"] = english_data["name"]
-                cleaned_item["search_terms"] = english_data["search_terms"]
-                if english_data.get("description"):
-                    cleaned_item["description_en"] = english_data["description"]
-            else:
-                cleaned_item["name_en"] = cleaned_item["name"]
-                cleaned_item["search_terms"] = ""
-
             if item.get("price") is not None:
                 try:
                     price = float(str(item["price"]).replace("$", "").replace(",", "").strip())
@@ -195,6 +243,27 @@ Important:
 
             cleaned_items.append(cleaned_item)
 
+        # Translate all items to English for image search in a single request
+        complete = True
+        if detected_language != "en" and cleaned_items:
+            english_results, complete = await translate_batch_to_english_for_search([
+                {
+                    "id": index,
+                    "name": cleaned_item["name"],
+                    "description": cleaned_item.get("description")
+                }
+                for index, cleaned_item in enumerate(cleaned_items)
+            ])
+            for cleaned_item, english_data in zip(cleaned_items, english_results):
+                cleaned_item["name_en"] = english_data["name"]
+                cleaned_item["search_terms"] = english_data["search_terms"]
+                if english_data.get("description"):
+                    cleaned_item["description_en"] = english_data["description"]
+        else:
+            for cleaned_item in cleaned_items:
+                cleaned_item["name_en"] = cleaned_item["name"]
+                cleaned_item["search_terms"] = ""
+
         logger.info(
             f"Extracted {len(cleaned_items)} menu items in {detected_language} with title '{menu_title}'"
         )
@@ -205,7 +274,7 @@ Important:
             "restaurant_name": restaurant_name,
             "currency": detected_currency,
             "language": detected_language
-        }
+        }, complete
 
     except Exception as e:
         logger.error(f"OpenAI extraction error: {str(e)}")
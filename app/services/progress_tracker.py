@@ -1,5 +1,5 @@
 from typing import Dict, Optional, Any
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import asyncio
 import json
 from collections import defaultdict
@@ -45,13 +45,13 @@ class ProgressTracker:
                 "stage": "starting",
                 "progress": 0,
                 "message": self.loading_messages[0],
-                "started_at": datetime.utcnow(),
+                "started_at": datetime.now(timezone.utc),
                 "estimated_total_time": total_time,
-                "estimated_completion": datetime.utcnow() + timedelta(seconds=total_time),
+                "estimated_completion": datetime.now(timezone.utc) + timedelta(seconds=total_time),
                 "item_count": estimated_items,
                 "menu_title": "Uploaded Menu",
                 "stages_completed": [],
-                "current_stage_start": datetime.utcnow()
+                "current_stage_start": datetime.now(timezone.utc)
             }
             logger.info(f"Started tracking task {task_id} with estimated time: {total_time}s")
     
@@ -84,19 +84,19 @@ class ProgressTracker:
             data["message"] = self.loading_messages[message_index]
             
             # Calculate time remaining
-            elapsed = (datetime.utcnow() - data["started_at"]).total_seconds()
+            elapsed = (datetime.now(timezone.utc) - data["started_at"]).total_seconds()
             if progress > 0:
                 estimated_total = elapsed / (progress / 100)
                 remaining = max(0, estimated_total - elapsed)
                 data["estimated_time_remaining"] = remaining
-                data["estimated_completion"] = datetime.utcnow() + timedelta(seconds=remaining)
+                data["estimated_completion"] = datetime.now(timezone.utc) + timedelta(seconds=remaining)
             
             # Update stage timing
             data["stages_completed"].append({
                 "stage": stage,
-                "duration": (datetime.utcnow() - data["current_stage_start"]).total_seconds()
+                "duration": (datetime.now(timezone.utc) - data["current_stage_start"]).total_seconds()
             })
-            data["current_stage_start"] = datetime.utcnow()
+            data["current_stage_start"] = datetime.now(timezone.utc)
 
             # Add any extra data (but handle item_image_update specially to avoid overwriting)
             if extra_data:
@@ -117,8 +117,8 @@ class ProgressTracker:
             data = self._progress_data[task_id]
             data["status"] = "completed" if success else "failed"
             data["progress"] = 100 if success else data.get("progress", 0)
-            data["completed_at"] = datetime.utcnow()
-            data["total_duration"] = (datetime.utcnow() - data["started_at"]).total_seconds()
+            data["completed_at"] = datetime.now(timezone.utc)
+            data["total_duration"] = (datetime.now(timezone.utc) - data["started_at"]).total_seconds()
             
             # Final notification
             await self._notify_subscribers(task_id, data)
@@ -148,7 +148,7 @@ class ProgressTracker:
                     "estimated_time_remaining": data.get("estimated_time_remaining", 0),
                     "item_count": data.get("item_count", 0),
                     "menu_title": data.get("menu_title"),
-                    "elapsed_time": (datetime.utcnow() - data["started_at"]).total_seconds()
+                    "elapsed_time": (datetime.now(timezone.utc) - data["started_at"]).total_seconds()
                 }
 
                 # Include optional fields if they exist
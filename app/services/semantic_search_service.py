@@ -1,6 +1,7 @@
 # app/services/semantic_search_service.py
 import os
 import logging
+import asyncio
 import numpy as np
 from typing import List, Dict, Tuple, Optional
 from openai import OpenAI
@@ -13,6 +14,7 @@ OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"  # Fast and cheap OpenAI model
 SIMILARITY_THRESHOLD = 0.7  # Minimum cosine similarity for a match
 SUPABASE_BUCKET = "menu-images"  # Bucket name
 SUPABASE_FOLDER = "dishes-photos"  # Folder within bucket
+MAX_CONCURRENT_SEARCHES = 8  # Bound on concurrent embedding + vector search lookups
 
 # Global OpenAI client
 _openai_client = None
@@ -57,8 +59,10 @@ async def search_similar_dishes(
         logger.info(f"Searching for similar dishes: '{query_text[:100]}...'")
 
         # Generate embedding for the query using OpenAI
+        # Run blocking SDK calls in a worker thread so lookups can overlap
         client = get_openai_client()
-        response = client.embeddings.create(
+        response = await asyncio.to_thread(
+            client.embeddings.create,
             model=OPENAI_EMBEDDING_MODEL,
             input=query_text
         )
@@ -69,14 +73,16 @@ async def search_similar_dishes(
 
         # Use RPC function for vector similarity search
         # This assumes you have a stored procedure in Supabase for vector search
-        response = supabase.rpc(
-            'search_dish_embeddings',
-            {
-                'query_embedding': query_embedding_list,
-                'match_threshold': threshold,
-                'match_count': top_k
-            }
-        ).execute()
+        response = await asyncio.to_thread(
+            supabase.rpc(
+                'search_dish_embeddings',
+                {
+                    'query_embedding': query_embedding_list,
+                    'match_threshold': threshold,
+                    'match_count': top_k
+                }
+            ).execute
+        )
 
         if not response.data:
             logger.info(f"No similar dishes found above threshold {threshold}")
@@ -194,6 +200,54 @@ async def log_missing_dish(
         # Don't fail the main request if logging fails
 
 
+async def log_missing_dishes_batch(items: List[Dict[str, str]]) -> None:
+    """
+    Log several dishes to items_without_pictures with one lookup and one insert.
+    Skips dishes already in the table and duplicates within the batch.
+
+    Args:
+        items: List of dicts with 'name' and optional 'description'
+    """
+    if not items:
+        return
+
+    try:
+        supabase = get_supabase_client()
+
+        # Deduplicate by (title, description), preserving order
+        candidates: Dict[Tuple[str, str], Dict[str, str]] = {}
+        for item in items:
+            key = (item['name'], item.get('description') or "")
+            candidates.setdefault(key, {"title": key[0], "description": key[1]})
+
+        titles = list({title for title, _ in candidates})
+
+        def _log():
+            existing = supabase.table("items_without_pictures") \
+                .select("title, description") \
+                .in_("title", titles) \
+                .execute()
+            existing_keys = {
+                (row.get("title"), row.get("description") or "")
+                for row in (existing.data or [])
+            }
+
+            new_rows = [row for key, row in candidates.items() if key not in existing_keys]
+            if new_rows:
+                supabase.table("items_without_pictures").insert(new_rows).execute()
+            return new_rows
+
+        new_rows = await asyncio.to_thread(_log)
+        logger.info(
+            f"Logged {len(new_rows)} new missing dishes "
+            f"({len(candidates) - len(new_rows)} already in items_without_pictures)"
+        )
+
+    except Exception as e:
+        logger.error(f"Error logging missing dishes: {str(e)}")
+        # Don't fail the main request if logging fails
+
+
 async def search_dishes_batch(
     items: List[Dict[str, str]],
     top_k: int = 1,
@@ -210,27 +264,29 @@ async def search_dishes_batch(
     Returns:
         Dict mapping item_id to list of matching dishes (single best match per item)
     """
-    results = {}
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
 
-    for item in items:
-        item_id = item['id']
+    async def search_item(item: Dict[str, str]) -> Tuple[str, List[Dict[str, any]]]:
         name = item['name']
         description = item.get('description')
 
-        matches = await search_similar_dishes(
-            query_name=name,
-            query_description=description,
-            top_k=top_k,
-            threshold=threshold
-        )
+        async with semaphore:
+            matches = await search_similar_dishes(
+                query_name=name,
+                query_description=description,
+                top_k=top_k,
+                threshold=threshold
+            )
+
+        return item['id'], matches
 
-        results[item_id] = matches
+    # Search all items concurrently (bounded by the semaphore)
+    search_results = dict(await asyncio.gather(*(search_item(item) for item in items)))
 
-        # Log items without matches
-        if not matches:
-            await log_missing_dish(name, description)
+    # Log items without matches in a single round-trip
+    await log_missing_dishes_batch([item for item in items if not search_results.get(item['id'])])
 
-    return results
+    return search_results
 
 
 def generate_embedding_for_text(text: str) -> List[float]:
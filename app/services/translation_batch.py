@@ -0,0 +1,186 @@
+# app/services/translation_batch.py
+import asyncio
+import logging
+import orjson
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from app.core.async_supabase import async_supabase_client
+from app.services.llm_cache import client
+from app.services.translation_service import (
+    LANGUAGE_MAP,
+    TRANSLATION_MODEL,
+    TRANSLATION_TEMPERATURE,
+    apply_translations,
+    build_translation_messages,
+    parse_translations,
+)
+
+logger = logging.getLogger(__name__)
+
+# Languages a menu is pre-translated into (English is the extraction language)
+PRETRANSLATE_LANGUAGES = [language for language in LANGUAGE_MAP if language != "en"]
+
+# How often the poller checks OpenAI for finished batches (seconds)
+POLL_INTERVAL = 300
+
+# Batch statuses that will not change any more
+_FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def _build_batch_file(menu_id: str, items: List[Dict], languages: List[str]) -> bytes:
+    """Serialize one chat completion request per target language into Batch API JSONL"""
+    lines = []
+    for language in languages:
+        lines.append(orjson.dumps({
+            "custom_id": f"{menu_id}:{language}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": TRANSLATION_MODEL,
+                "messages": build_translation_messages(items, language),
+                "temperature": TRANSLATION_TEMPERATURE,
+                "response_format": {"type": "json_object"}
+            }
+        }))
+    return b"\n".join(lines)
+
+
+async def submit_menu_translation_batch(menu_id: str, items: List[Dict],
+                                        languages: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Queue translation of a menu's items into every target language via the OpenAI Batch API.
+    Items need 'id' (the menu_items id), 'name' and 'description'.
+    Returns the OpenAI batch id, or None if there was nothing to submit.
+    """
+    languages = languages or PRETRANSLATE_LANGUAGES
+    if not items or not languages:
+        return None
+
+    batch_file = await client.files.create(
+        file=(f"menu-{menu_id}.jsonl", _build_batch_file(menu_id, items, languages)),
+        purpose="batch"
+    )
+    batch = await client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+        metadata={"menu_id": menu_id}
+    )
+
+    await async_supabase_client.table_insert("translation_batches", {
+        "batch_id": batch.id,
+        "menu_id": menu_id,
+        "languages": languages,
+        "status": batch.status,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    })
+
+    logger.info(f"Submitted translation batch {batch.id} for menu {menu_id} ({len(languages)} languages)")
+    return batch.id
+
+
+async def _store_batch_output(output_file_id: str) -> int:
+    """Download a finished batch's output file and upsert its translations. Returns rows stored."""
+    output = await client.files.content(output_file_id)
+
+    # Translations are keyed by menu item id, so the source items are loaded per menu
+    items_by_menu: Dict[str, List[Dict]] = {}
+    rows = []
+
+    for line in output.text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            result = orjson.loads(line)
+            menu_id, language = result["custom_id"].rsplit(":", 1)
+            response = result.get("response") or {}
+            if response.get("status_code") != 200:
+                logger.warning(f"Batch request {result['custom_id']} failed: {result.get('error')}")
+                continue
+            content = response["body"]["choices"][0]["message"]["content"]
+
+            if menu_id not in items_by_menu:
+                items_response = await async_supabase_client.table_select(
+                    "menu_items",
+                    "id, item_name, description",
+                    eq={"menu_id": menu_id}
+                )
+                items_by_menu[menu_id] = [
+                    {"id": item["id"], "name": item["item_name"], "description": item["description"]}
+                    for item in items_response.data or []
+                ]
+
+            # Only ids the model actually returned are stored; the rest are left to
+            # the live translation path instead of caching the untranslated original
+            translated_map = parse_translations(content)
+            for item in apply_translations(items_by_menu[menu_id], translated_map):
+                if item["id"] not in translated_map:
+                    continue
+                rows.append({
+                    "menu_item_id": item["id"],
+                    "language": language,
+                    "name": item["name"],
+                    "description": item.get("description")
+                })
+        except Exception as e:
+            logger.error(f"Error parsing batch output line: {str(e)}")
+
+    if rows:
+        await async_supabase_client.table_upsert(
+            "menu_item_translations", rows, on_conflict="menu_item_id,language"
+        )
+    return len(rows)
+
+
+async def poll_translation_batches():
+    """Check pending batches and store the results of any that have completed"""
+    pending_response = await async_supabase_client.table_select(
+        "translation_batches",
+        "batch_id, menu_id",
+        eq={"processed": False}
+    )
+
+    for record in pending_response.data or []:
+        batch_id = record["batch_id"]
+        try:
+            batch = await client.batches.retrieve(batch_id)
+            if batch.status not in _FINAL_STATUSES:
+                continue
+
+            update = {"status": batch.status, "processed": True}
+            if batch.status == "completed" and batch.output_file_id:
+                stored = await _store_batch_output(batch.output_file_id)
+                logger.info(f"Stored {stored} translations from batch {batch_id} (menu {record['menu_id']})")
+            else:
+                logger.warning(f"Translation batch {batch_id} finished with status {batch.status}")
+
+            await async_supabase_client.table_update(
+                "translation_batches", update, eq={"batch_id": batch_id}
+            )
+        except Exception as e:
+            logger.error(f"Error polling translation batch {batch_id}: {str(e)}")
+
+
+async def translation_batch_poller_task():
+    """Background task that periodically collects finished translation batches"""
+    while True:
+        await asyncio.sleep(POLL_INTERVAL)
+        try:
+            await poll_translation_batches()
+        except Exception as e:
+            logger.error(f"Translation batch poller error: {str(e)}")
+
+
+async def get_stored_translations(menu_item_ids: List[str], language: str) -> Dict[str, Dict]:
+    """Return pre-translated name/description keyed by menu item id for the given language"""
+    if not menu_item_ids:
+        return {}
+
+    response = await async_supabase_client.table_select(
+        "menu_item_translations",
+        "menu_item_id, name, description",
+        eq={"language": language},
+        in_={"menu_item_id": menu_item_ids}
+    )
+    return {row["menu_item_id"]: row for row in response.data or []}
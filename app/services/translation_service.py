@@ -1,15 +1,46 @@
 # app/services/translation_service.py
-import openai
-import json
+import orjson
 import logging
-import os
-from typing import Dict, List, Optional
 import asyncio
+import re
+from typing import Dict, List, Optional, Tuple
+
+import langid
+
+from app.core.async_supabase import async_supabase_client
+from app.services.llm_cache import cached_chat
 
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Shared by the interactive path and the Batch API pre-translation jobs
+TRANSLATION_MODEL = "gpt-4o-mini"
+TRANSLATION_TEMPERATURE = 0.3
+
+# Language mapping for OpenAI
+LANGUAGE_MAP = {
+    "en": "English",
+    "fr": "French",
+    "de": "German",
+    "es": "Spanish",
+    "it": "Italian",
+    "pt": "Portuguese",
+    "ja": "Japanese",
+    "ko": "Korean",
+    "zh": "Chinese",
+    "ar": "Arabic",
+    "hi": "Hindi",
+    "ru": "Russian"
+}
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+
+_SYSTEM_MSG = "You are a professional translator specializing in restaurant menus and culinary terms."
+
+# Kept terse: input tokens dominate cost and prefill latency for large menus
+_PROMPT_TMPL = """Translate these menu items to {lang}.
+Rules: translate only name and description; keep id and JSON structure unchanged; keep culinary terms commonly used in the original language; sound natural and appetizing; items without a description get none.
+Items: {items_json}
+Return JSON: {{"items":[{{"id":"...","name":"...","description":"...or null"}}]}}"""
 
 async def translate_menu_items(items: List[Dict], target_language: str, source_language: str = "auto") -> List[Dict]:
     """Translate menu items to target language using OpenAI"""
@@ -17,111 +48,63 @@ async def translate_menu_items(items: List[Dict], target_language: str, source_l
     if not items or target_language == "en":
         # No translation needed if target is English
         return items
-    
-    # Language mapping for OpenAI
-    language_map = {
-        "en": "English",
-        "fr": "French",
-        "de": "German",
-        "es": "Spanish",
-        "it": "Italian",
-        "pt": "Portuguese",
-        "ja": "Japanese",
-        "ko": "Korean",
-        "zh": "Chinese",
-        "ar": "Arabic",
-        "hi": "Hindi",
-        "ru": "Russian"
-    }
-    
-    target_lang_name = language_map.get(target_language, target_language)
-    
-    # Prepare items for translation (only name and description)
-    items_to_translate = []
-    for item in items:
-        translation_item = {
-            "id": item.get("id"),
-            "name": item.get("name"),
-            "description": item.get("description")
-        }
-        items_to_translate.append(translation_item)
-    
-    prompt = f"""You are a professional menu translator. Translate the following menu items to {target_lang_name}.
 
-Important rules:
-1. Maintain the exact same JSON structure
-2. Only translate the 'name' and 'description' fields
-3. Keep the 'id' field unchanged
-4. Preserve any culinary terms that are commonly used in the original language
-5. Make the translations sound natural and appetizing in the target language
-6. If description is null or empty, keep it as null
+    # Skip the LLM round-trip when the menu is already in the target language
+    if source_language and source_language != "auto":
+        detected_language = source_language.lower()
+    else:
+        sample_text = " ".join(
+            f"{item.get('name') or ''} {item.get('description') or ''}" for item in items[:5]
+        ).strip()
+        detected_language = await detect_language(sample_text)
+    if detected_language == target_language:
+        logger.info(f"Menu items already in {target_language}, skipping translation")
+        return items
 
-Menu items to translate:
-{json.dumps(items_to_translate, ensure_ascii=False)}
+    # Items whose name was translated before and have no description to translate
+    # are filled from the shared name cache; only the rest go to the LLM
+    cached_names = await get_cached_name_translations(
+        [item.get("name") for item in items], target_language
+    )
+    resolved_items = {}
+    pending_items = []
+    for index, item in enumerate(items):
+        cached_name = cached_names.get(normalize_item_name(item.get("name")))
+        if cached_name and not item.get("description"):
+            resolved_item = item.copy()
+            resolved_item["name"] = cached_name
+            resolved_items[index] = resolved_item
+        else:
+            pending_items.append((index, item))
 
-Return a JSON object with this exact structure:
-{{
-    "items": [
-        {{
-            "id": "original_id_here",
-            "name": "translated_name_here",
-            "description": "translated_description_here_or_null"
-        }}
-    ]
-}}"""
+    if not pending_items:
+        logger.info(f"All {len(items)} menu item names found in translation cache for {target_language}")
+        return [resolved_items[index] for index in range(len(items))]
+
+    items_for_llm = [item for _, item in pending_items]
+    messages = build_translation_messages(items_for_llm, target_language)
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a professional translator specializing in restaurant menus and culinary terms."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.3,
+        content = await cached_chat(
+            model=TRANSLATION_MODEL,
+            messages=messages,
+            temperature=TRANSLATION_TEMPERATURE,
             response_format={"type": "json_object"}
         )
         
-        content = response.choices[0].message.content
         logger.info(f"Raw OpenAI translation response: {content}")
         
-        translated_data = json.loads(content)
-        logger.info(f"Parsed translation data: {translated_data}")
-        
-        # Get the items array from the response
-        if isinstance(translated_data, dict) and "items" in translated_data:
-            translated_items = translated_data["items"]
-        elif isinstance(translated_data, list):
-            translated_items = translated_data
-        else:
-            logger.warning(f"Unexpected translation data format: {translated_data}")
-            translated_items = translated_data
-        
-        logger.info(f"Extracted translated items: {translated_items}")
-        
-        # Merge translations back with original items
-        translated_map = {item["id"]: item for item in translated_items if isinstance(item, dict) and "id" in item}
-        
-        result_items = []
-        for original_item in items:
-            item_id = original_item.get("id")
-            if item_id and item_id in translated_map:
-                # Merge translated fields with original item
-                translated_item = original_item.copy()
-                translated_item["name"] = translated_map[item_id].get("name", original_item["name"])
-                if "description" in translated_map[item_id]:
-                    translated_item["description"] = translated_map[item_id]["description"]
-                result_items.append(translated_item)
-            else:
-                # Keep original if translation not found
-                result_items.append(original_item)
+        translated_items = merge_translations(items_for_llm, content)
+        for (index, _), translated_item in zip(pending_items, translated_items):
+            resolved_items[index] = translated_item
+        result_items = [resolved_items[index] for index in range(len(items))]
+
+        await store_name_translations(items_for_llm, translated_items, target_language)
         
-        logger.info(f"Successfully translated {len(result_items)} menu items to {target_language}")
+        logger.info(
+            f"Successfully translated {len(result_items)} menu items to {target_language} "
+            f"({len(items) - len(pending_items)} from name cache)"
+        )
         return result_items
         
     except Exception as e:
@@ -129,6 +112,122 @@ Return a JSON object with this exact structure:
         # Return original items if translation fails
         return items
 
+def normalize_item_name(name: Optional[str]) -> str:
+    """Normalize a dish name for the translation cache: lowercase, no punctuation, single spaces"""
+    if not name:
+        return ""
+    return " ".join(_PUNCTUATION_RE.sub(" ", name.lower()).split())
+
+async def get_cached_name_translations(names: List[Optional[str]], target_language: str) -> Dict[str, str]:
+    """Look up previously translated dish names, keyed by normalized name"""
+    name_norms = list({normalize_item_name(name) for name in names} - {""})
+    if not name_norms:
+        return {}
+
+    try:
+        response = await async_supabase_client.table_select(
+            "translation_cache",
+            "name_norm, name_translated",
+            eq={"target_lang": target_language},
+            in_={"name_norm": name_norms}
+        )
+        return {row["name_norm"]: row["name_translated"] for row in response.data or []}
+    except Exception as e:
+        logger.warning(f"Translation cache lookup failed: {str(e)}")
+        return {}
+
+async def store_name_translations(original_items: List[Dict], translated_items: List[Dict], target_language: str):
+    """Save newly translated dish names to the shared translation cache"""
+    rows = {}
+    for original_item, translated_item in zip(original_items, translated_items):
+        name_norm = normalize_item_name(original_item.get("name"))
+        translated_name = translated_item.get("name")
+        # An unchanged name usually means the item was missing from the response
+        if name_norm and translated_name and translated_name != original_item.get("name"):
+            rows[name_norm] = {
+                "name_norm": name_norm,
+                "target_lang": target_language,
+                "name_translated": translated_name
+            }
+
+    if not rows:
+        return
+
+    try:
+        await async_supabase_client.table_upsert(
+            "translation_cache", list(rows.values()), on_conflict="name_norm,target_lang"
+        )
+    except Exception as e:
+        logger.warning(f"Failed to store name translations: {str(e)}")
+
+def build_translation_messages(items: List[Dict], target_language: str) -> List[Dict]:
+    """Build the chat messages asking the model to translate menu items to target_language"""
+
+    # Empty descriptions are left out of the payload; merge_translations keeps the original
+    items_to_translate = [
+        {"id": item.get("id"), "name": item.get("name"), "description": item["description"]}
+        if item.get("description") else {"id": item.get("id"), "name": item.get("name")}
+        for item in items
+    ]
+    
+    prompt = _PROMPT_TMPL.format(
+        lang=LANGUAGE_MAP.get(target_language, target_language),
+        items_json=orjson.dumps(items_to_translate).decode()
+    )
+
+    return [
+        {
+            "role": "system",
+            "content": _SYSTEM_MSG
+        },
+        {
+            "role": "user",
+            "content": prompt
+        }
+    ]
+
+def parse_translations(content: str) -> Dict:
+    """Parse a raw JSON translation response into translated items keyed by id"""
+
+    translated_data = orjson.loads(content)
+    logger.info(f"Parsed translation data: {translated_data}")
+    
+    # Get the items array from the response
+    if isinstance(translated_data, dict) and "items" in translated_data:
+        translated_items = translated_data["items"]
+    elif isinstance(translated_data, list):
+        translated_items = translated_data
+    else:
+        logger.warning(f"Unexpected translation data format: {translated_data}")
+        translated_items = translated_data
+    
+    logger.info(f"Extracted translated items: {translated_items}")
+    
+    return {item["id"]: item for item in translated_items if isinstance(item, dict) and "id" in item}
+
+def apply_translations(items: List[Dict], translated_map: Dict) -> List[Dict]:
+    """Merge parsed translations back into the original items, keeping originals that are missing"""
+    
+    result_items = []
+    for original_item in items:
+        item_id = original_item.get("id")
+        if item_id and item_id in translated_map:
+            # Merge translated fields with original item
+            translated_item = original_item.copy()
+            translated_item["name"] = translated_map[item_id].get("name", original_item["name"])
+            if "description" in translated_map[item_id]:
+                translated_item["description"] = translated_map[item_id]["description"]
+            result_items.append(translated_item)
+        else:
+            # Keep original if translation not found
+            result_items.append(original_item)
+
+    return result_items
+
+def merge_translations(items: List[Dict], content: str) -> List[Dict]:
+    """Merge a raw JSON translation response back into the original items"""
+    return apply_translations(items, parse_translations(content))
+
 async def translate_to_english_for_search(item_name: str, item_description: Optional[str] = None) -> Dict[str, str]:
     """Translate menu item to English for Google search"""
     
@@ -147,7 +246,7 @@ Input: "Poulet Rôti", "Poulet fermier aux herbes"
 Output: {{"name": "Roast Chicken", "search_terms": "roasted chicken herbs french", "description": "Farm chicken with herbs"}}"""
 
     try:
-        response = client.chat.completions.create(
+        content = await cached_chat(
             model="gpt-4o-mini",
             messages=[
                 {
@@ -159,8 +258,7 @@ Output: {{"name": "Roast Chicken", "search_terms": "roasted chicken herbs french
             response_format={"type": "json_object"}
         )
         
-        content = response.choices[0].message.content
-        result = json.loads(content)
+        result = orjson.loads(content)
         
         return {
             "name": result.get("name", item_name),
@@ -177,20 +275,48 @@ Output: {{"name": "Roast Chicken", "search_terms": "roasted chicken herbs french
             "description": item_description
         }
 
-async def detect_language(text: str) -> str:
-    """Detect the language of the given text"""
-    
-    if not text:
-        return "en"
-    
-    prompt = f"""Detect the language of this text and return only the ISO 639-1 language code (e.g., 'en', 'fr', 'es', 'de', 'it', 'ja', 'ko', 'zh').
+async def translate_batch_to_english_for_search(items: List[Dict]) -> Tuple[List[Dict], bool]:
+    """Translate several menu items to English for Google search in a single request
+
+    Each input item needs 'id', 'name' and optionally 'description'. Returns one
+    result per input item, in the same order, with 'id', 'name', 'search_terms'
+    and 'description', plus whether every item was translated. Items missing from
+    the response keep their original text.
+    """
+
+    if not items:
+        return [], True
+
+    items_to_translate = [
+        {
+            "id": str(item.get("id")),
+            "name": item.get("name"),
+            "description": item.get("description")
+        }
+        for item in items
+    ]
+
+    prompt = f"""Translate these menu items to English for searching food images.
 
-Text: {text}
+Menu items:
+{orjson.dumps(items_to_translate).decode()}
+
+For each item return:
+1. "id": The original id, unchanged
+2. "name": The English translation of the dish name
+3. "search_terms": Additional English search terms that would help find images of this dish
+4. "description": English translation of the description (null if not provided)
+
+Return a JSON object with this exact structure:
+{{"items": [{{"id": "original_id_here", "name": "...", "search_terms": "...", "description": "..."}}]}}
 
-Return only the 2-letter language code."""
+Example item:
+Input: {{"id": "1", "name": "Poulet Rôti", "description": "Poulet fermier aux herbes"}}
+Output: {{"id": "1", "name": "Roast Chicken", "search_terms": "roasted chicken herbs french", "description": "Farm chicken with herbs"}}"""
 
+    translated_map = {}
     try:
-        response = client.chat.completions.create(
+        content = await cached_chat(
             model="gpt-4o-mini",
             messages=[
                 {
@@ -198,11 +324,50 @@ Return only the 2-letter language code."""
                     "content": prompt
                 }
             ],
-            temperature=0,
-            max_tokens=10
+            temperature=0.3,
+            response_format={"type": "json_object"}
         )
-        
-        language_code = response.choices[0].message.content.strip().lower()
+
+        result = orjson.loads(content)
+        translated_items = result.get("items", []) if isinstance(result, dict) else result
+        translated_map = {
+            str(item["id"]): item
+            for item in translated_items
+            if isinstance(item, dict) and "id" in item
+        }
+
+    except Exception as e:
+        logger.error(f"Error batch translating to English: {str(e)}")
+
+    results = []
+    for original_item in items_to_translate:
+        translated = translated_map.get(original_item["id"], {})
+        results.append({
+            "id": original_item["id"],
+            "name": translated.get("name") or original_item["name"],
+            "search_terms": translated.get("search_terms") or "",
+            "description": translated.get("description") or original_item["description"]
+        })
+
+    success = len(translated_map) >= len(items_to_translate)
+    if not success:
+        logger.warning(
+            f"Batch English translation returned {len(translated_map)}/{len(items_to_translate)} items"
+        )
+
+    return results, success
+
+async def detect_language(text: str) -> str:
+    """Detect the language of the given text with a local language identification model"""
+    
+    if not text:
+        return "en"
+
+    try:
+        # langid runs locally in well under a millisecond once its model is loaded;
+        # the thread hop keeps the one-off model load off the event loop
+        language_code, _ = await asyncio.to_thread(langid.classify, text.replace("\n", " "))
+        language_code = language_code.strip().lower()
         
         # Validate it's a 2-letter code
         if len(language_code) == 2 and language_code.isalpha():
@@ -212,4 +377,4 @@ Return only the 2-letter language code."""
             
     except Exception as e:
         logger.error(f"Error detecting language: {str(e)}")
-        return "en"  # Default to English on error
\ No newline at end of file
+        return "en"  # Default to English on error
@@ -1,5 +1,6 @@
 # app/utils/currency_detector.py
 from typing import Optional, Dict
+from collections import Counter
 import re
 import logging
 
@@ -56,6 +57,21 @@ REGIONAL_CURRENCY_HINTS = {
     'CNY': ['china', 'chinese', 'beijing', 'shanghai', 'guangzhou'],
 }
 
+def _compile_alternation(patterns, flags=0):
+    """Compile literal patterns into one alternation, longest first so e.g. 'NZ$' wins over '$'"""
+    ordered = sorted(set(patterns), key=len, reverse=True)
+    return re.compile("|".join(re.escape(pattern) for pattern in ordered), flags)
+
+# Precompiled matchers, one per detection tier so tier priority is preserved
+_CODE_RE = _compile_alternation(CURRENCY_CODES, re.IGNORECASE)
+_SYMBOL_RE = _compile_alternation(CURRENCY_SYMBOLS)
+_HINT_TO_CODE = {
+    hint: currency
+    for currency, hints in REGIONAL_CURRENCY_HINTS.items()
+    for hint in hints
+}
+_HINT_RE = _compile_alternation(_HINT_TO_CODE, re.IGNORECASE)
+
 def detect_currency_from_text(text: str) -> Optional[str]:
     """
     Detect currency from extracted text content
@@ -69,23 +85,20 @@ def detect_currency_from_text(text: str) -> Optional[str]:
     if not text:
         return None
     
-    text_lower = text.lower()
-    
     # Look for explicit currency codes
-    for code in CURRENCY_CODES:
-        if code.lower() in text_lower:
-            return code
+    match = _CODE_RE.search(text)
+    if match:
+        return match.group(0).upper()
     
     # Look for currency symbols
-    for symbol, code in CURRENCY_SYMBOLS.items():
-        if symbol in text:
-            return code
+    match = _SYMBOL_RE.search(text)
+    if match:
+        return CURRENCY_SYMBOLS[match.group(0)]
     
     # Look for regional hints
-    for currency, hints in REGIONAL_CURRENCY_HINTS.items():
-        for hint in hints:
-            if hint in text_lower:
-                return currency
+    match = _HINT_RE.search(text)
+    if match:
+        return _HINT_TO_CODE[match.group(0).lower()]
     
     return None
 
@@ -102,12 +115,12 @@ def detect_currency_from_prices(prices: list) -> Optional[str]:
     if not prices:
         return None
     
-    # Look for currency symbols in price strings
+    # Look for currency symbols in price strings (one precompiled scan per string)
     for price in prices:
         if isinstance(price, str):
-            for symbol, code in CURRENCY_SYMBOLS.items():
-                if symbol in price:
-                    return code
+            match = _SYMBOL_RE.search(price)
+            if match:
+                return CURRENCY_SYMBOLS[match.group(0)]
     
     return None
 
@@ -173,12 +186,8 @@ def detect_currency_comprehensive(restaurant_name: str = None,
     
     # Return most common currency detected, or USD as fallback
     if detected_currencies:
-        # Count occurrences and return most frequent
-        currency_counts = {}
-        for curr in detected_currencies:
-            currency_counts[curr] = currency_counts.get(curr, 0) + 1
-        
-        most_common = max(currency_counts, key=currency_counts.get)
+        # Count occurrences and return most frequent (ties go to the earliest signal)
+        most_common = Counter(detected_currencies).most_common(1)[0][0]
         logger.info(f"Detected currency: {most_common} (from {detected_currencies})")
         return validate_currency_code(most_common)
     
@@ -1,13 +1,20 @@
+import gc
+
+# Fewer, larger collections: request handling allocates many short-lived objects
+_gen0, _gen1, _gen2 = gc.get_threshold()
+gc.set_threshold(_gen0 * 4, _gen1 * 2, _gen2 * 2)
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse
 from contextlib import asynccontextmanager
 import logging
 from typing import Optional
 import os
 import sys
 import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -18,91 +25,123 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app.routers import auth, menu, user, translation
 from app.core.logging import setup_logging
-from app.core.supabase_client import get_supabase_client, close_connections
+from app.core.config import get_settings
+from app.core.supabase_client import get_supabase_rest_client, close_connections
 from app.core.cache import cache_cleanup_task
+from app.services.translation_batch import translation_batch_poller_task
 
-# Request size limiting middleware
-class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
+# Request size limiting middleware (plain ASGI: only the request headers are inspected)
+class RequestSizeLimitMiddleware:
     def __init__(self, app, max_size: int = 15 * 1024 * 1024):  # 15MB default
-        super().__init__(app)
+        self.app = app
         self.max_size = max_size
 
-    async def dispatch(self, request, call_next):
-        content_length = request.headers.get("content-length")
-        if content_length and int(content_length) > self.max_size:
-            return JSONResponse(
-                status_code=413,
-                content={"detail": "Request entity too large"}
-            )
-        return await call_next(request)
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    if value.isdigit() and int(value) > self.max_size:
+                        response = ORJSONResponse(
+                            status_code=413,
+                            content={"detail": "Request entity too large"}
+                        )
+                        await response(scope, receive, send)
+                        return
+                    break
+        await self.app(scope, receive, send)
 
 # Setup logging
 setup_logging()
 logger = logging.getLogger(__name__)
 
+# Parsed once at import; fails fast if a required environment variable is missing
+settings = get_settings()
+
+# Seconds a /health result is reused before probing the database again
+HEALTH_CACHE_TTL = 2.0
+_health_cache = {"ts": 0.0, "value": None}
+_health_lock = asyncio.Lock()
+
+# Upper bound on worker threads used by asyncio.to_thread / run_in_executor
+DEFAULT_EXECUTOR_WORKERS = 32
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handle application startup and shutdown"""
     logger.info("Starting DishPlay API server...")
+
+    # Python 3.12+: run new tasks eagerly until their first real suspension,
+    # skipping a loop iteration for tasks that finish without awaiting I/O
+    if sys.version_info >= (3, 12):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
     
-    # Verify required environment variables
-    required_vars = [
-        "SUPABASE_URL",
-        "SUPABASE_ANON_KEY",
-        "OPENAI_API_KEY"
-    ]
-    
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
-    if missing_vars:
-        logger.error(f"Missing required environment variables: {', '.join(missing_vars)}")
-        raise RuntimeError(f"Missing required environment variables: {', '.join(missing_vars)}")
-    
-    logger.info("All required environment variables are present")
+    logger.info(f"Loaded settings for {settings.ENVIRONMENT} environment")
+
+    # Open the async Supabase REST client used by the health check
+    get_supabase_rest_client()
+
+    # Bounded thread pool for blocking Supabase SDK and Pillow calls
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=DEFAULT_EXECUTOR_WORKERS)
+    )
     
     # Start cache cleanup task
     cleanup_task = asyncio.create_task(cache_cleanup_task())
     logger.info("Started cache cleanup task")
     
-    yield
+    # Start translation batch poller
+    batch_poller_task = asyncio.create_task(translation_batch_poller_task())
+    logger.info("Started translation batch poller")
     
-    # Cancel cleanup task
-    cleanup_task.cancel()
     try:
-        await cleanup_task
-    except asyncio.CancelledError:
-        pass
-    
-    logger.info("Shutting down DishPlay API server...")
-    # Close connection pool
-    await close_connections()
+        yield
+    finally:
+        # Cancel background tasks
+        for task in (cleanup_task, batch_poller_task):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        
+        logger.info("Shutting down DishPlay API server...")
+        # Close the shared HTTP connection pool used by the OpenAI clients
+        await close_connections()
 
 # Create FastAPI app with lifespan
 app = FastAPI(
     title="DishPlay API",
     description="Backend API for DishPlay menu digitization application",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
-app.add_middleware(RequestSizeLimitMiddleware)
-
-# Configure CORS - allow all origins for now
+# Configure CORS - origins come from ALLOWED_ORIGINS (defaults to all origins)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Allows all origins
+    allow_origins=settings.allowed_origins_list,
     allow_credentials=True,
-    allow_methods=["*"],  # Allows all methods including OPTIONS
-    allow_headers=["*"],  # Allows all headers
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
+    allow_headers=["Authorization", "Content-Type"],
     expose_headers=["*"],  # Expose all headers to the client
     max_age=3600,  # Cache preflight requests for 1 hour
 )
 
+# Added last so it is the outermost middleware: oversized requests are
+# rejected before CORS or routing does any work
+app.add_middleware(RequestSizeLimitMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(menu.router, prefix="/api/menu", tags=["Menu"])
 app.include_router(user.router, prefix="/api/user", tags=["User"])
 app.include_router(translation.router, prefix="/api/translation", tags=["Translation"])
 
+# Imports and route setup are done; move these long-lived objects out of GC tracking
+gc.collect()
+gc.freeze()
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -115,34 +154,51 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint for monitoring"""
-    try:
-        # Test database connection
-        client = get_supabase_client()
-        response = client.table("users").select("id").limit(1).execute()
-        # Check if response has data (indicating successful connection)
-        if hasattr(response, 'data'):
-            db_status = "healthy"
-        else:
-            db_status = "unhealthy"
-    except Exception as e:
-        logger.error(f"Database health check failed: {str(e)}")
-        db_status = "unhealthy"
+    # Probes tolerate a couple of seconds of staleness; serve the last result
+    if time.monotonic() - _health_cache["ts"] < HEALTH_CACHE_TTL:
+        return _health_cache["value"]
     
-    return {
-        "status": "healthy" if db_status == "healthy" else "degraded",
-        "services": {
-            "api": "healthy",
-            "database": db_status
+    async with _health_lock:
+        # Another request may have refreshed the result while we waited
+        if time.monotonic() - _health_cache["ts"] < HEALTH_CACHE_TTL:
+            return _health_cache["value"]
+        
+        try:
+            # Test database connection without going through the blocking SDK
+            client = get_supabase_rest_client()
+            response = await client.get(
+                "/rest/v1/users",
+                params={"select": "id", "limit": 1},
+                timeout=2.0
+            )
+            if response.status_code == 200:
+                db_status = "healthy"
+            else:
+                db_status = "unhealthy"
+        except Exception as e:
+            logger.error(f"Database health check failed: {str(e)}")
+            db_status = "unhealthy"
+        
+        _health_cache["value"] = {
+            "status": "healthy" if db_status == "healthy" else "degraded",
+            "services": {
+                "api": "healthy",
+                "database": db_status
+            }
         }
-    }
+        _health_cache["ts"] = time.monotonic()
+        return _health_cache["value"]
 
 # This is important - it needs to be at module level for uvicorn to find it
 if __name__ == "__main__":
     import uvicorn
-    port = int(os.getenv("PORT", 8000))
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
-        port=port,
-        reload=os.getenv("ENVIRONMENT", "production") == "development"
+        port=settings.PORT,
+        reload=settings.ENVIRONMENT == "development",
+        # uvloop and httptools have no Windows support; fall back to the stdlib loop and h11
+        loop="uvloop" if sys.platform != "win32" else "asyncio",
+        http="httptools" if sys.platform != "win32" else "h11",
+        access_log=False
     )
@@ -5,30 +5,56 @@ import os
 import sys
 from pathlib import Path
 from dotenv import load_dotenv
+import orjson
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app.core.supabase_client import get_supabase_client
+from app.core.supabase_client import get_shared_httpx
 
 load_dotenv()
 
 BUCKET_NAME = "menu-images"
 FOLDER_PATH = "dishes-photos"
+PAGE_SIZE = 1000
+
+
+def list_files(client, bucket, prefix):
+    """Page through the storage list endpoint, keeping only name and size"""
+    files = []
+    offset = 0
+    while True:
+        response = client.post(
+            f"/storage/v1/object/list/{bucket}",
+            content=orjson.dumps({
+                "prefix": prefix,
+                "limit": PAGE_SIZE,
+                "offset": offset,
+                "sortBy": {"column": "name", "order": "asc"}
+            }),
+            headers={"Content-Type": "application/json"}
+        )
+        response.raise_for_status()
+        page = orjson.loads(response.content)
+
+        files.extend(
+            {"name": f.get("name", ""), "size": (f.get("metadata") or {}).get("size", 0)}
+            for f in page
+        )
+        if len(page) < PAGE_SIZE:
+            return files
+        offset += len(page)
 
-supabase = get_supabase_client()
 
 print(f"Listing files in bucket: {BUCKET_NAME}/{FOLDER_PATH}")
 print("-" * 80)
 
 try:
-    files = supabase.storage.from_(BUCKET_NAME).list(path=FOLDER_PATH)
+    files = list_files(get_shared_httpx(), BUCKET_NAME, FOLDER_PATH)
 
     print(f"Found {len(files)} files:\n")
 
     for i, f in enumerate(files[:20], 1):  # Show first 20
-        name = f.get("name", "")
-        size = f.get("metadata", {}).get("size", 0)
-        print(f"{i}. {name} ({size} bytes)")
+        print(f"{i}. {f['name']} ({f['size']} bytes)")
 
     if len(files) > 20:
         print(f"\n... and {len(files) - 20} more files")
@@ -9,25 +9,20 @@ This GUI automates two workflows:
 Author: Dishplay Team
 """
 
-import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
+# tkinter, csv, pyarrow, httpx, dotenv and the Supabase client are imported where they
+# are used, so importing this module (e.g. to reuse a helper) stays cheap
 import threading
+import asyncio
 import os
+import re
 import sys
-import csv
-import subprocess
+from collections import deque
 from pathlib import Path
 from datetime import datetime
-from dotenv import load_dotenv
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.core.supabase_client import get_supabase_client
-
-# Load environment
-load_dotenv()
-
 # Paths
 BACKEND_DIR = Path(__file__).parent.parent
 HELPER_DIR = BACKEND_DIR.parent / "dishplay-helper"
@@ -38,6 +33,26 @@ INPUT_CSV = CSV_TO_TEXT_DIR / "input.csv"
 OLLAMA_SCRIPT = CSV_TO_TEXT_DIR / "csv_to_prompts_ollama.py"
 EMBED_SCRIPT = CLEAN_DISH_DIR / "embed_prompts_meta.py"
 UPLOAD_SCRIPT = BACKEND_DIR / "scripts" / "upload_embeddings_from_prompts_meta.py"
+OLLAMA_TAGS_URL = "http://127.0.0.1:11434/api/tags"
+
+# Rows per items_without_pictures page when fetching unmatched items
+FETCH_PAGE_SIZE = 1000
+
+# How often queued log lines are written to the log widget
+LOG_FLUSH_INTERVAL_MS = 50
+
+# Item ids per items_without_pictures PATCH request
+MARK_PROCESSED_CHUNK_SIZE = 500
+
+# Lines of script output kept for the error message when a script fails
+OUTPUT_TAIL_LINES = 50
+# Bytes read from script output at a time
+OUTPUT_READ_SIZE = 4096
+# Longest partial line buffered before it is logged anyway
+OUTPUT_LINE_LIMIT = 1024 * 1024
+
+# Script output is split on both newlines and the carriage returns progress bars use
+_OUTPUT_LINE_SPLIT = re.compile(rb"[\r\n]")
 
 
 class SemanticSearchGUI:
@@ -50,10 +65,22 @@ class SemanticSearchGUI:
         # Variables
         self.is_running = False
 
+        # Parsed prompts_meta.csv, shared between Flow 1 and Flow 2 while the file is unchanged
+        self._prompts_table = None
+        self._prompts_table_mtime = None
+
+        # Log lines waiting to be written to the widget; appended from worker threads
+        self._log_queue = deque()
+
         # Setup UI
         self.setup_ui()
 
+        # Flush queued log lines to the widget periodically
+        self.root.after(LOG_FLUSH_INTERVAL_MS, self._flush_log)
+
     def setup_ui(self):
+        from tkinter import ttk, scrolledtext
+
         # Title
         title_label = ttk.Label(
             self.root,
@@ -123,13 +150,21 @@ class SemanticSearchGUI:
         footer_label.pack(anchor="w")
 
     def log(self, message, level="INFO"):
-        """Add log message to text widget"""
+        """Queue a log message for the text widget; safe to call from worker threads"""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        formatted_msg = f"[{timestamp}] [{level}] {message}\n"
+        self._log_queue.append(f"[{timestamp}] [{level}] {message}\n")
 
-        self.log_text.insert(tk.END, formatted_msg)
-        self.log_text.see(tk.END)
-        self.root.update_idletasks()
+    def _flush_log(self):
+        """Write all queued log messages to the text widget in one insert"""
+        import tkinter as tk
+
+        if self._log_queue:
+            lines = []
+            while self._log_queue:
+                lines.append(self._log_queue.popleft())
+            self.log_text.insert(tk.END, "".join(lines))
+            self.log_text.see(tk.END)
+        self.root.after(LOG_FLUSH_INTERVAL_MS, self._flush_log)
 
     def set_buttons_state(self, state):
         """Enable or disable buttons"""
@@ -138,67 +173,70 @@ class SemanticSearchGUI:
 
     def run_flow1(self):
         """Run Flow 1: Generate prompts for unmatched items"""
+        import tkinter as tk
+        from tkinter import messagebox
+
         if self.is_running:
             messagebox.showwarning("Warning", "A flow is already running!")
             return
 
         self.is_running = True
         self.set_buttons_state("disabled")
+        self._log_queue.clear()
         self.log_text.delete(1.0, tk.END)
         self.progress.start()
 
-        # Run in thread to avoid blocking UI
-        thread = threading.Thread(target=self._flow1_worker, daemon=True)
+        # Run the flow on its own event loop in a thread to avoid blocking UI
+        thread = threading.Thread(target=lambda: asyncio.run(self._flow1_worker()), daemon=True)
         thread.start()
 
     def run_flow2(self):
         """Run Flow 2: Generate & upload embeddings"""
+        import tkinter as tk
+        from tkinter import messagebox
+
         if self.is_running:
             messagebox.showwarning("Warning", "A flow is already running!")
             return
 
         self.is_running = True
         self.set_buttons_state("disabled")
+        self._log_queue.clear()
         self.log_text.delete(1.0, tk.END)
         self.progress.start()
 
-        # Run in thread to avoid blocking UI
-        thread = threading.Thread(target=self._flow2_worker, daemon=True)
+        # Run the flow on its own event loop in a thread to avoid blocking UI
+        thread = threading.Thread(target=lambda: asyncio.run(self._flow2_worker()), daemon=True)
         thread.start()
 
-    def _flow1_worker(self):
-        """Flow 1 worker thread"""
+    async def _flow1_worker(self):
+        """Flow 1 worker coroutine"""
         try:
             self.log("=" * 80)
             self.log("FLOW 1: Generate Prompts from items_without_pictures", "INFO")
             self.log("=" * 80)
 
-            # Step 1: Fetch all items from items_without_pictures table
+            # Steps 1-2: Page through items_without_pictures, writing rows straight to the input CSV
             self.log("Step 1/5: Fetching all items from items_without_pictures...", "INFO")
-            unmatched_items = self._fetch_unmatched_items()
+            self.log("Step 2/5: Creating input CSV for Ollama...", "INFO")
+            item_ids, processed_count = self._create_input_csv(self._fetch_unmatched_items())
 
-            if not unmatched_items:
+            if not item_ids:
                 self.log("No items found in items_without_pictures table!", "SUCCESS")
                 self._finish_flow(success=True)
                 return
 
-            # Count processed vs unprocessed
-            processed_count = sum(1 for item in unmatched_items if item.get('processed', False))
-            unprocessed_count = len(unmatched_items) - processed_count
+            unprocessed_count = len(item_ids) - processed_count
 
-            self.log(f"Found {len(unmatched_items)} total items:", "SUCCESS")
+            self.log(f"Found {len(item_ids)} total items:", "SUCCESS")
             self.log(f"  - {unprocessed_count} unprocessed items", "INFO")
             self.log(f"  - {processed_count} already processed items", "INFO")
-
-            # Step 2: Create input CSV for Ollama script
-            self.log("Step 2/5: Creating input CSV for Ollama...", "INFO")
-            self._create_input_csv(unmatched_items)
             self.log(f"Created input CSV: {INPUT_CSV}", "SUCCESS")
 
             # Step 3: Run Ollama script to generate prompts
             self.log("Step 3/5: Running Ollama to generate prompts...", "INFO")
             self.log("This may take several minutes depending on the number of items...", "INFO")
-            self._run_ollama_script()
+            await self._run_ollama_script()
             self.log("Prompts generated successfully!", "SUCCESS")
 
             # Step 4: Update prompts_meta.csv with new entries
@@ -208,7 +246,7 @@ class SemanticSearchGUI:
 
             # Step 5: Mark items as processed in Supabase
             self.log("Step 5/5: Marking items as processed in Supabase...", "INFO")
-            self._mark_items_processed(unmatched_items)
+            await self._mark_items_processed(item_ids)
             self.log("Marked all items as processed", "SUCCESS")
 
             self.log("=" * 80)
@@ -226,8 +264,8 @@ class SemanticSearchGUI:
             self.log("Flow 1 failed!", "ERROR")
             self._finish_flow(success=False, error=str(e))
 
-    def _flow2_worker(self):
-        """Flow 2 worker thread"""
+    async def _flow2_worker(self):
+        """Flow 2 worker coroutine"""
         try:
             self.log("=" * 80)
             self.log("FLOW 2: Generate & Upload New Embeddings", "INFO")
@@ -245,12 +283,12 @@ class SemanticSearchGUI:
             # Step 3: Generate embeddings for new items
             self.log("Step 2/3: Generating embeddings for new items...", "INFO")
             self.log("This may take several minutes depending on number of new items...", "INFO")
-            self._run_embed_script_on_file(new_items_csv)
+            await self._run_embed_script_on_file(new_items_csv)
             self.log("Embeddings generated successfully!", "SUCCESS")
 
             # Step 4: Upload only new embeddings to Supabase (append mode)
             self.log("Step 3/3: Uploading new embeddings to Supabase...", "INFO")
-            self._run_upload_script()
+            await self._run_upload_script()
             self.log("New embeddings uploaded successfully!", "SUCCESS")
 
             self.log("=" * 80)
@@ -267,6 +305,8 @@ class SemanticSearchGUI:
 
     def _finish_flow(self, success=True, error=None):
         """Finish flow execution"""
+        from tkinter import messagebox
+
         self.progress.stop()
         self.is_running = False
         self.set_buttons_state("normal")
@@ -276,33 +316,84 @@ class SemanticSearchGUI:
         else:
             messagebox.showerror("Error", f"Flow failed!\n\nError: {error}")
 
+    async def _stream_script(self, args, cwd, name):
+        """Run a Python script, streaming its output to the log as it is produced"""
+        # -u: unbuffered child stdout, so lines arrive as they are printed
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-u",
+            *args,
+            cwd=cwd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT
+        )
+
+        tail = deque(maxlen=OUTPUT_TAIL_LINES)
+
+        def emit(raw_line):
+            line = raw_line.decode('utf-8', errors='replace').rstrip()
+            if line:
+                tail.append(line)
+                self.log(line, "INFO")
+
+        buffer = b""
+        while True:
+            chunk = await proc.stdout.read(OUTPUT_READ_SIZE)
+            if not chunk:
+                break
+            *lines, buffer = _OUTPUT_LINE_SPLIT.split(buffer + chunk)
+            for raw_line in lines:
+                emit(raw_line)
+            if len(buffer) > OUTPUT_LINE_LIMIT:
+                emit(buffer)
+                buffer = b""
+        emit(buffer)
+
+        if await proc.wait() != 0:
+            raise Exception(f"{name} failed:\n" + "\n".join(tail))
+
     # ========== Flow 1 Helper Methods ==========
 
     def _fetch_unmatched_items(self):
-        """Fetch all items from items_without_pictures table"""
+        """Yield all items from items_without_pictures, one keyset page at a time"""
+        from app.core.supabase_client import get_supabase_client
+
         try:
             self.log("Connecting to Supabase...", "INFO")
             supabase = get_supabase_client()
 
-            # Fetch ALL items regardless of processed status
+            # Fetch ALL items regardless of processed status; PostgREST caps each response,
+            # so page by id instead of relying on a single unbounded select
             self.log("Fetching all rows from items_without_pictures table...", "INFO")
-            response = supabase.table('items_without_pictures') \
-                .select('id, title, description, processed') \
-                .execute()
-
-            self.log(f"Raw response: {response}", "INFO")
-            self.log(f"Response data type: {type(response.data)}", "INFO")
-            self.log(f"Number of items fetched: {len(response.data) if response.data else 0}", "INFO")
-
-            return response.data
+            last_id = 0
+            while True:
+                response = supabase.table('items_without_pictures') \
+                    .select('id, title, description, processed') \
+                    .gt('id', last_id) \
+                    .order('id') \
+                    .limit(FETCH_PAGE_SIZE) \
+                    .execute()
+
+                if not response.data:
+                    break
+                yield from response.data
+                last_id = response.data[-1]['id']
         except Exception as e:
             self.log(f"Exception details: {str(e)}", "ERROR")
             raise Exception(f"Failed to fetch items from items_without_pictures: {str(e)}")
 
     def _create_input_csv(self, items):
-        """Create input.csv for Ollama script"""
+        """
+        Write input.csv for Ollama script from an iterable of items.
+        Returns the ids of the written items and how many were already processed.
+        """
+        import csv
+
         CSV_TO_TEXT_DIR.mkdir(parents=True, exist_ok=True)
 
+        item_ids = []
+        processed_count = 0
+
         with open(INPUT_CSV, 'w', encoding='utf-8', newline='') as f:
             writer = csv.DictWriter(f, fieldnames=['title', 'short_description', 'precise_content'])
             writer.writeheader()
@@ -313,87 +404,130 @@ class SemanticSearchGUI:
                     'short_description': item.get('description', ''),
                     'precise_content': item.get('description', '')  # Use description as precise_content
                 })
+                item_ids.append(item['id'])
+                if item.get('processed', False):
+                    processed_count += 1
 
-    def _run_ollama_script(self):
+        return item_ids, processed_count
+
+    async def _run_ollama_script(self):
         """Run Ollama script to generate prompts"""
+        import httpx
+
         if not OLLAMA_SCRIPT.exists():
             raise FileNotFoundError(f"Ollama script not found at {OLLAMA_SCRIPT}")
 
         # Check if Ollama is running
         try:
-            result = subprocess.run(
-                ['curl', '-s', 'http://127.0.0.1:11434/api/tags'],
-                capture_output=True,
-                timeout=5
-            )
-            if result.returncode != 0:
-                raise Exception("Ollama is not running. Please start Ollama first.")
-        except subprocess.TimeoutExpired:
+            async with httpx.AsyncClient(timeout=2.0) as client:
+                response = await client.get(OLLAMA_TAGS_URL)
+            if response.status_code != 200:
+                raise Exception("Ollama is not responding. Please check if it's running.")
+        except httpx.TimeoutException:
             raise Exception("Ollama is not responding. Please check if it's running.")
-        except FileNotFoundError:
-            # curl not available on Windows, skip check
-            pass
+        except httpx.RequestError:
+            raise Exception("Ollama is not running. Please start Ollama first.")
 
         # Run script
-        result = subprocess.run(
-            [sys.executable, str(OLLAMA_SCRIPT)],
-            cwd=str(CSV_TO_TEXT_DIR),
-            capture_output=True,
-            text=True
-        )
+        await self._stream_script([str(OLLAMA_SCRIPT)], str(CSV_TO_TEXT_DIR), "Ollama script")
 
-        if result.returncode != 0:
-            raise Exception(f"Ollama script failed:\n{result.stderr}")
+    def _load_prompts_table(self):
+        """
+        Parse prompts_meta.csv into a pyarrow Table, every column as a string.
+        The parsed table is reused until the file changes on disk.
+        """
+        import csv
+        import pyarrow as pa
+        import pyarrow.csv as pv
 
-        # Log output
-        for line in result.stdout.split('\n'):
-            if line.strip():
-                self.log(line, "INFO")
+        mtime = PROMPTS_META_CSV.stat().st_mtime_ns
+        if self._prompts_table is not None and self._prompts_table_mtime == mtime:
+            return self._prompts_table
 
-    def _update_prompts_meta(self):
-        """Update prompts_meta.csv with new entries from Ollama output"""
-        # Read existing prompts_meta.csv if it exists
-        existing_rows = []
-        if PROMPTS_META_CSV.exists():
-            with open(PROMPTS_META_CSV, 'r', encoding='utf-8', newline='') as f:
-                reader = csv.DictReader(f)
-                existing_rows = list(reader)
-
-        # Read new entries from Ollama output (they're already in prompts_meta.csv)
-        # The Ollama script appends to prompts_meta.csv, but we want to deduplicate
+        # Read the header first so every column can be typed as string and values
+        # round-trip exactly as written (no numeric or date inference)
         with open(PROMPTS_META_CSV, 'r', encoding='utf-8', newline='') as f:
-            reader = csv.DictReader(f)
-            all_rows = list(reader)
-
-        # Deduplicate by name
-        seen = set()
-        unique_rows = []
-        for row in all_rows:
-            name = row.get('name', '')
-            if name not in seen:
-                seen.add(name)
-                unique_rows.append(row)
-
-        # Write back deduplicated data
-        with open(PROMPTS_META_CSV, 'w', encoding='utf-8', newline='') as f:
-            if unique_rows:
-                fieldnames = list(unique_rows[0].keys())
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(unique_rows)
-
-        self.log(f"Total unique entries in prompts_meta.csv: {len(unique_rows)}", "INFO")
-
-    def _mark_items_processed(self, items):
+            column_names = next(csv.reader(f), [])
+
+        # An empty file has no header; pyarrow would reject it, so use an empty table
+        if not column_names:
+            self._prompts_table = pa.table({})
+            self._prompts_table_mtime = mtime
+            return self._prompts_table
+
+        self._prompts_table = pv.read_csv(
+            PROMPTS_META_CSV,
+            # Descriptions may contain quoted line breaks
+            parse_options=pv.ParseOptions(newlines_in_values=True),
+            convert_options=pv.ConvertOptions(
+                column_types={name: pa.string() for name in column_names},
+                strings_can_be_null=False
+            )
+        )
+        self._prompts_table_mtime = mtime
+        return self._prompts_table
+
+    @staticmethod
+    def _prompts_name_column(table):
+        """Name column of a prompts table: 'name', or 'name_opt' for legacy files"""
+        for column in ('name', 'name_opt'):
+            if column in table.column_names:
+                return column
+        return None
+
+    def _update_prompts_meta(self):
+        """Deduplicate prompts_meta.csv by name after the Ollama script appended to it"""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.csv as pv
+
+        table = self._load_prompts_table()
+        name_column = self._prompts_name_column(table)
+
+        if name_column is not None and table.num_rows:
+            # Keep the first row for each name, in original file order
+            row_numbers = pa.table({
+                'name': table.column(name_column),
+                'row': pa.array(range(table.num_rows), type=pa.int64())
+            })
+            first_rows = row_numbers.group_by('name').aggregate([('row', 'min')]).column('row_min')
+            table = table.take(pc.take(first_rows, pc.sort_indices(first_rows)))
+
+            tmp_csv = PROMPTS_META_CSV.with_name(PROMPTS_META_CSV.name + '.tmp')
+            pv.write_csv(table, tmp_csv)
+            os.replace(tmp_csv, PROMPTS_META_CSV)
+
+            # The table now matches the rewritten file; keep it for Flow 2
+            self._prompts_table = table
+            self._prompts_table_mtime = PROMPTS_META_CSV.stat().st_mtime_ns
+
+        self.log(f"Total unique entries in prompts_meta.csv: {table.num_rows}", "INFO")
+
+    async def _mark_items_processed(self, item_ids):
         """Mark items as processed in Supabase"""
-        try:
-            supabase = get_supabase_client()
-            item_ids = [item['id'] for item in items]
+        from app.core.supabase_client import create_supabase_rest_client
 
-            supabase.table('items_without_pictures') \
-                .update({'processed': True}) \
-                .in_('id', item_ids) \
-                .execute()
+        try:
+            # Keep each PATCH URL well under PostgREST's URL length limit
+            chunks = [
+                item_ids[i:i + MARK_PROCESSED_CHUNK_SIZE]
+                for i in range(0, len(item_ids), MARK_PROCESSED_CHUNK_SIZE)
+            ]
+
+            # A client per flow: each flow runs on its own event loop
+            async with create_supabase_rest_client() as client:
+                responses = await asyncio.gather(*(
+                    client.patch(
+                        '/rest/v1/items_without_pictures',
+                        params={'id': f"in.({','.join(str(item_id) for item_id in chunk)})"},
+                        json={'processed': True},
+                        headers={'Prefer': 'return=minimal'}
+                    )
+                    for chunk in chunks
+                ))
+
+            for response in responses:
+                response.raise_for_status()
 
         except Exception as e:
             raise Exception(f"Failed to mark items as processed: {str(e)}")
@@ -402,53 +536,63 @@ class SemanticSearchGUI:
 
     def _filter_new_items(self):
         """Filter prompts_meta.csv to only include items not in Supabase"""
-        import csv
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.csv as pv
+        from app.core.supabase_client import get_shared_httpx
 
         # Get existing name_opt values from Supabase
         try:
-            supabase = get_supabase_client()
-            response = supabase.table('dish_embeddings') \
-                .select('name_opt') \
-                .execute()
+            client = get_shared_httpx()
+            existing_names = set()
+            offset = 0
+            # PostgREST returns at most 1000 rows per request
+            while True:
+                response = client.get(
+                    '/rest/v1/dish_embeddings',
+                    params={'select': 'name_opt', 'order': 'id', 'limit': 1000, 'offset': offset}
+                )
+                response.raise_for_status()
+                rows = response.json()
+                existing_names.update(row['name_opt'] for row in rows)
+                if len(rows) < 1000:
+                    break
+                offset += len(rows)
 
-            existing_names = {item['name_opt'] for item in response.data} if response.data else set()
             self.log(f"Found {len(existing_names)} existing dishes in database", "INFO")
 
         except Exception as e:
             self.log(f"Warning: Could not fetch existing embeddings: {str(e)}", "INFO")
             existing_names = set()
 
-        # Read prompts_meta.csv
-        with open(PROMPTS_META_CSV, 'r', encoding='utf-8', newline='') as f:
-            reader = csv.DictReader(f)
-            all_prompts = list(reader)
+        # Read prompts_meta.csv (reuses the table parsed in Flow 1 if the file is unchanged)
+        all_prompts = self._load_prompts_table()
 
-        self.log(f"Loaded {len(all_prompts)} items from prompts_meta.csv", "INFO")
+        self.log(f"Loaded {all_prompts.num_rows} items from prompts_meta.csv", "INFO")
 
         # Filter to only new items
-        new_items = []
-        for item in all_prompts:
-            item_name = item.get('name', item.get('name_opt', ''))
-            if item_name not in existing_names:
-                new_items.append(item)
+        name_column = self._prompts_name_column(all_prompts)
+        if name_column is None:
+            new_items = all_prompts
+        else:
+            is_existing = pc.is_in(
+                all_prompts.column(name_column),
+                value_set=pa.array(list(existing_names), type=pa.string())
+            )
+            new_items = all_prompts.filter(pc.invert(is_existing))
 
-        self.log(f"Found {len(new_items)} new items to process", "INFO")
+        self.log(f"Found {new_items.num_rows} new items to process", "INFO")
 
-        if not new_items:
+        if not new_items.num_rows:
             raise Exception("No new items to process. All items already exist in database.")
 
         # Write new items to a temporary CSV
         new_items_csv = PROMPTS_META_CSV.parent / "prompts_meta_new.csv"
-        with open(new_items_csv, 'w', encoding='utf-8', newline='') as f:
-            if new_items:
-                fieldnames = list(new_items[0].keys())
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(new_items)
+        pv.write_csv(new_items, new_items_csv)
 
         return new_items_csv
 
-    def _run_embed_script_on_file(self, csv_file):
+    async def _run_embed_script_on_file(self, csv_file):
         """Run embedding generation script on specific CSV file"""
         import shutil
 
@@ -470,28 +614,17 @@ class SemanticSearchGUI:
         self.log(f"Copied filtered CSV to {original_csv}", "INFO")
 
         # Run embed script
-        result = subprocess.run(
-            [sys.executable, str(EMBED_SCRIPT)],
-            cwd=str(CLEAN_DISH_DIR),
-            capture_output=True,
-            text=True
-        )
-
-        if result.returncode != 0:
-            raise Exception(f"Embed script failed:\n{result.stderr}")
-
-        # Log output
-        for line in result.stdout.split('\n'):
-            if line.strip():
-                self.log(line, "INFO")
+        await self._stream_script([str(EMBED_SCRIPT)], str(CLEAN_DISH_DIR), "Embed script")
 
     def _clear_old_embeddings(self):
         """Clear old embeddings from Supabase"""
+        from app.core.supabase_client import get_supabase_client
+
         try:
             supabase = get_supabase_client()
 
-            # Delete all rows from dish_embeddings
-            supabase.table('dish_embeddings').delete().neq('id', 0).execute()
+            # Truncate dish_embeddings via RPC (see create_truncate_dish_embeddings_function.sql)
+            supabase.rpc('truncate_dish_embeddings').execute()
 
             self.log("Deleted all old embeddings", "INFO")
 
@@ -499,7 +632,7 @@ class SemanticSearchGUI:
             # If table is empty, this might fail - that's OK
             self.log(f"Note: {str(e)}", "INFO")
 
-    def _run_embed_script(self):
+    async def _run_embed_script(self):
         """Run embedding generation script"""
         if not EMBED_SCRIPT.exists():
             raise FileNotFoundError(f"Embed script not found at {EMBED_SCRIPT}")
@@ -508,22 +641,9 @@ class SemanticSearchGUI:
             raise FileNotFoundError(f"prompts_meta.csv not found at {PROMPTS_META_CSV}")
 
         # Run script
-        result = subprocess.run(
-            [sys.executable, str(EMBED_SCRIPT)],
-            cwd=str(CLEAN_DISH_DIR),
-            capture_output=True,
-            text=True
-        )
-
-        if result.returncode != 0:
-            raise Exception(f"Embed script failed:\n{result.stderr}")
+        await self._stream_script([str(EMBED_SCRIPT)], str(CLEAN_DISH_DIR), "Embed script")
 
-        # Log output
-        for line in result.stdout.split('\n'):
-            if line.strip():
-                self.log(line, "INFO")
-
-    def _run_upload_script(self):
+    async def _run_upload_script(self):
         """Run upload embeddings script"""
         if not UPLOAD_SCRIPT.exists():
             raise FileNotFoundError(f"Upload script not found at {UPLOAD_SCRIPT}")
@@ -533,46 +653,52 @@ class SemanticSearchGUI:
             raise FileNotFoundError(f"Embeddings directory not found at {embeddings_dir}")
 
         # Run script
-        result = subprocess.run(
+        await self._stream_script(
             [
-                sys.executable,
                 str(UPLOAD_SCRIPT),
                 '--csv-path', str(PROMPTS_META_CSV),
                 '--embeddings-dir', str(embeddings_dir)
             ],
-            cwd=str(BACKEND_DIR),
-            capture_output=True,
-            text=True
+            str(BACKEND_DIR),
+            "Upload script"
         )
 
-        if result.returncode != 0:
-            raise Exception(f"Upload script failed:\n{result.stderr}")
 
-        # Log output
-        for line in result.stdout.split('\n'):
-            if line.strip():
-                self.log(line, "INFO")
+def main():
+    import tkinter as tk
+    from dotenv import load_dotenv
 
+    # Load environment
+    load_dotenv()
 
-def main():
-    # Check paths exist
+    # Check paths exist: list each parent directory once instead of a stat per path
     issues = []
-
-    if not CSV_TO_TEXT_DIR.exists():
-        issues.append(f"CSV-to-structured-text directory not found at {CSV_TO_TEXT_DIR}")
-    if not CLEAN_DISH_DIR.exists():
-        issues.append(f"Clean-dish-list directory not found at {CLEAN_DISH_DIR}")
-    if not OLLAMA_SCRIPT.exists():
-        issues.append(f"Ollama script not found at {OLLAMA_SCRIPT}")
-    if not EMBED_SCRIPT.exists():
-        issues.append(f"Embed script not found at {EMBED_SCRIPT}")
-    if not UPLOAD_SCRIPT.exists():
-        issues.append(f"Upload script not found at {UPLOAD_SCRIPT}")
+    listings = {}
+
+    def _exists(path):
+        if path.parent not in listings:
+            try:
+                listings[path.parent] = set(os.listdir(path.parent))
+            except OSError:
+                listings[path.parent] = set()
+        return path.name in listings[path.parent]
+
+    required_paths = [
+        (CSV_TO_TEXT_DIR, "CSV-to-structured-text directory"),
+        (CLEAN_DISH_DIR, "Clean-dish-list directory"),
+        (OLLAMA_SCRIPT, "Ollama script"),
+        (EMBED_SCRIPT, "Embed script"),
+        (UPLOAD_SCRIPT, "Upload script"),
+    ]
+    for path, label in required_paths:
+        if not _exists(path):
+            issues.append(f"{label} not found at {path}")
 
     # Check environment variables
-    if not os.getenv('SUPABASE_URL'):
+    env = os.environ
+    if not env.get('SUPABASE_URL'):
         issues.append("SUPABASE_URL not set in environment variables")
-    if not (os.getenv('SUPABASE_SERVICE_ROLE_KEY') or os.getenv('SUPABASE_ANON_KEY')):
+    if not (env.get('SUPABASE_SERVICE_ROLE_KEY') or env.get('SUPABASE_ANON_KEY')):
         issues.append("SUPABASE_SERVICE_ROLE_KEY or SUPABASE_ANON_KEY not set in environment variables")
 
     if issues:
@@ -12,15 +12,22 @@ Usage:
 
 import os
 import sys
+import time
+import asyncio
 import argparse
+import json
+import orjson
+import httpx
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 from dotenv import load_dotenv
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.core.supabase_client import get_supabase_client
+from app.core.supabase_client import create_supabase_rest_client
 
 # Load environment variables
 load_dotenv()
@@ -32,9 +39,43 @@ DEFAULT_EMBEDDINGS_DIR = os.path.join(
     "embeddings"
 )
 
+# Columns read from prompts_meta.csv and from the embeddings parquet
+META_COLUMNS = {'name', 'name_opt', 'title', 'description', 'type'}
+EMBEDDING_COLUMNS = ['title', 'text_for_embedding', 'embedding']
 
-def load_embeddings_and_metadata(csv_path, embeddings_dir):
-    """Load embeddings and metadata from files"""
+# Uploaded columns and the merged columns they may come from, in order of preference
+OUTPUT_COLUMN_SOURCES = {
+    'name_opt': ['name_meta', 'name', 'name_opt_meta', 'name_opt'],
+    'title': ['title'],
+    'description': ['description_meta', 'description'],
+    'type': ['type_meta', 'type'],
+}
+
+# Upsert batching. Each request runs as one transaction on a pooled Supabase
+# connection and must finish within the statement timeout (about 30s for the
+# service role); several small batches in flight keep every transaction short
+# without leaving pooler connections idle. Concurrency should stay well below
+# the project's pooler pool size.
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_CONCURRENCY = 8
+
+# Smallest batch size the upload backs off to after statement timeouts
+MIN_BATCH_SIZE = 10
+
+# Per-request timeout for a batch upsert (seconds)
+UPLOAD_TIMEOUT = 30.0
+
+# Decimal places sent per embedding component. Components of normalized
+# embeddings are small, so 5 places keeps at least fp16-level precision
+# while cutting the JSON text per vector by more than half.
+EMBEDDING_DECIMALS = 5
+
+
+def load_embeddings_and_metadata(csv_path, embeddings_dir, verbose=False):
+    """
+    Load embeddings and metadata from files.
+    Returns (metadata DataFrame, float32 embedding matrix with one row per DataFrame row), or None.
+    """
 
     print(f"Loading metadata from CSV: {csv_path}")
 
@@ -43,9 +84,23 @@ def load_embeddings_and_metadata(csv_path, embeddings_dir):
         print(f"Error: CSV file not found at {csv_path}")
         return None
 
-    df_meta = pd.read_csv(csv_path)
+    # Only the metadata columns that end up in dish_embeddings are parsed, into
+    # Arrow-backed columns (contiguous UTF-8 instead of one Python object per cell)
+    df_meta = pd.read_csv(
+        csv_path,
+        usecols=lambda column: column in META_COLUMNS,
+        dtype_backend='pyarrow'
+    )
     print(f"Loaded {len(df_meta)} records from CSV")
 
+    # Few distinct dish types, so a categorical column is much smaller than strings
+    if 'type' in df_meta.columns:
+        df_meta['type'] = df_meta['type'].fillna('food').astype('category')
+
+    if verbose:
+        print(f"\nMetadata memory usage (bytes):")
+        print(df_meta.memory_usage(deep=True))
+
     # Show sample
     print(f"\nSample metadata:")
     print(df_meta.head(2))
@@ -60,29 +115,50 @@ def load_embeddings_and_metadata(csv_path, embeddings_dir):
         return None
 
     print(f"\nLoading embeddings from: {parquet_path}")
-    df_embeddings = pd.read_parquet(parquet_path)
-    print(f"Loaded {len(df_embeddings)} embeddings")
+    # Parquet is columnar, so only the join keys and the vectors are read from disk
+    available_columns = set(pq.read_schema(parquet_path).names)
+    # Row groups are decoded in parallel, with their column chunks fetched in coalesced reads
+    table = pq.read_table(
+        parquet_path,
+        columns=[column for column in EMBEDDING_COLUMNS if column in available_columns],
+        use_threads=True,
+        pre_buffer=True
+    )
+    print(f"Loaded {table.num_rows} embeddings")
+
+    if table.num_rows == 0:
+        print("\nError: Embeddings parquet file is empty")
+        return None
+
+    # Vectors go into one contiguous float32 matrix; the DataFrame only keeps
+    # the join keys plus each row's index into the matrix
+    embeddings = _embedding_matrix(table.column('embedding'))
+    df_embeddings = table.drop(['embedding']).to_pandas(types_mapper=pd.ArrowDtype)
+    df_embeddings['_emb_row'] = np.arange(len(df_embeddings))
 
     # The parquet file should have been generated with text_for_embedding column
     # that combines title and description
     # We need to match it with our prompts_meta records
 
     # Strategy: Match based on title
-    # First, create a text_for_embedding column in df_meta to match with df_embeddings
-    df_meta['text_for_embedding'] = df_meta['title'] + '. ' + df_meta['description'].fillna('')
-
     # Try to merge on title first
     if 'title' in df_embeddings.columns:
         print("\nMerging embeddings with metadata on 'title' column...")
-        merged = df_embeddings.merge(
-            df_meta,
+        # Filter to matching titles first, then look the metadata up by its title index
+        meta_by_title = df_meta.set_index('title')
+        mask = df_embeddings['title'].isin(meta_by_title.index)
+        merged = df_embeddings.loc[mask].join(
+            meta_by_title,
             on='title',
             how='inner',
-            suffixes=('_emb', '_meta')
+            lsuffix='_emb',
+            rsuffix='_meta'
         )
     else:
-        # If embeddings don't have title, try merging on text_for_embedding
+        # If embeddings don't have title, try merging on text_for_embedding,
+        # built in df_meta the same way the embedding text was
         print("\nMerging embeddings with metadata on 'text_for_embedding' column...")
+        df_meta['text_for_embedding'] = df_meta['title'] + '. ' + df_meta['description'].fillna('')
         merged = df_embeddings.merge(
             df_meta,
             on='text_for_embedding',
@@ -97,138 +173,189 @@ def load_embeddings_and_metadata(csv_path, embeddings_dir):
 
     print(f"\nSuccessfully matched {len(merged)} records")
 
-    # After merge, we might have suffixes. Let's clean up the columns
-    # Prefer _meta suffix (from prompts_meta CSV) for metadata columns
-    # and keep embedding from embeddings dataframe
-    result = pd.DataFrame()
-
-    # Get the right columns, handling potential suffixes
+    # After merge, we might have suffixes. Map each output column to the first
+    # source column present, preferring the _meta suffix (from prompts_meta CSV).
     # Support both 'name' and 'name_opt' for backwards compatibility
-    if 'name_meta' in merged.columns:
-        result['name_opt'] = merged['name_meta']
-    elif 'name' in merged.columns:
-        result['name_opt'] = merged['name']
-    elif 'name_opt_meta' in merged.columns:
-        result['name_opt'] = merged['name_opt_meta']
-    elif 'name_opt' in merged.columns:
-        result['name_opt'] = merged['name_opt']
-
-    result['title'] = merged['title']
-
-    if 'description_meta' in merged.columns:
-        result['description'] = merged['description_meta']
-    elif 'description' in merged.columns:
-        result['description'] = merged['description']
-
-    if 'type_meta' in merged.columns:
-        result['type'] = merged['type_meta']
-    elif 'type' in merged.columns:
-        result['type'] = merged['type']
-
-    result['embedding'] = merged['embedding']
+    rename_map = {}
+    for target, candidates in OUTPUT_COLUMN_SOURCES.items():
+        source = next((column for column in candidates if column in merged.columns), None)
+        if source is not None:
+            rename_map[source] = target
 
     # Check for required columns
-    required = ['name_opt', 'title', 'description', 'type', 'embedding']
-    missing = [col for col in required if col not in result.columns]
+    missing = [col for col in OUTPUT_COLUMN_SOURCES if col not in rename_map.values()]
 
     if missing:
         print(f"\nError: Missing required columns: {missing}")
-        print(f"Available columns: {list(result.columns)}")
+        print(f"Available columns: {list(merged.columns)}")
         return None
 
-    return result
+    result = merged[list(rename_map) + ['_emb_row']].rename(columns=rename_map)
+    emb_rows = result.pop('_emb_row').to_numpy()
+
+    # Reorder the matrix to match the merged rows
+    return result, embeddings[emb_rows]
+
+
+def _embedding_matrix(column):
+    """Convert the parquet embedding column into an (n, dim) float32 matrix"""
+    # Some exports store embeddings as JSON array strings; parse the whole column once
+    if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+        return np.array([json.loads(e) for e in column.to_pylist()], dtype=np.float32)
+    return np.stack(column.to_numpy(zero_copy_only=False)).astype(np.float32, copy=False)
+
+
+async def _upsert(client, records):
+    """Upsert one batch of records into dish_embeddings via PostgREST"""
+    response = await client.post(
+        '/rest/v1/dish_embeddings',
+        params={'on_conflict': 'name_opt'},
+        content=orjson.dumps(records),
+        headers={
+            'Content-Type': 'application/json',
+            'Prefer': 'resolution=merge-duplicates,return=minimal'
+        },
+        timeout=UPLOAD_TIMEOUT
+    )
+    response.raise_for_status()
+
+
+def _is_timeout(error):
+    """True if an upsert failed because of a client or Postgres statement timeout"""
+    if isinstance(error, httpx.TimeoutException):
+        return True
+    text = str(error)
+    if isinstance(error, httpx.HTTPStatusError):
+        text += error.response.text
+    text = text.lower()
+    return '57014' in text or 'timeout' in text
+
+
+class _UploadQueue:
+    """Records shared by the upload workers, handed out in batches of the current size"""
+
+    def __init__(self, records, embeddings, batch_size):
+        self.records = records
+        self.embeddings = embeddings
+        self.position = 0
+        self.batch_size = batch_size
+        self.uploaded = 0
+        self.errors = 0
+
+    def next_batch(self):
+        end = self.position + self.batch_size
+        batch = self.records[self.position:end]
+        # Vectors are converted to lists one batch at a time, straight from the matrix,
+        # rounded so the JSON payload carries no more digits than the search needs
+        vectors = self.embeddings[self.position:end].astype(np.float64).round(EMBEDDING_DECIMALS)
+        # Fresh dicts keep self.records metadata-only, so uploaded vectors can be freed
+        self.position += len(batch)
+        return [
+            {**record, 'embedding': embedding}
+            for record, embedding in zip(batch, vectors.tolist())
+        ]
+
+    def shrink(self):
+        """Halve the batch size for every worker after a timeout"""
+        new_size = max(MIN_BATCH_SIZE, self.batch_size // 2)
+        if new_size < self.batch_size:
+            print(f"  Timeout - reducing batch size from {self.batch_size} to {new_size}")
+            self.batch_size = new_size
+
+
+async def _upload_batch(client, queue, records):
+    """Upload one batch, shrinking or splitting it on failure"""
+    try:
+        start_time = time.time()
+        await _upsert(client, records)
+        queue.uploaded += len(records)
+        print(f"Uploaded {len(records)} records "
+              f"({queue.uploaded}/{len(queue.records)}) "
+              f"- {time.time() - start_time:.1f}s")
+        return
+
+    except Exception as e:
+        print(f"Error uploading batch of {len(records)}: {str(e)}")
+        error = e
+
+    # Timeouts mean the batch is too big for the statement timeout: shrink the
+    # shared batch size so later batches stay under it, and resend this one
+    if _is_timeout(error) and len(records) > MIN_BATCH_SIZE:
+        queue.shrink()
+        # Read the size once: nested or concurrent timeouts keep shrinking the
+        # shared value, and the step and slices must agree to cover every record
+        size = queue.batch_size
+        for i in range(0, len(records), size):
+            await _upload_batch(client, queue, records[i:i + size])
+        return
+
+    # For large batches, try splitting in half instead of one by one
+    if len(records) > 50:
+        print(f"  Retrying with smaller batches...")
+        mid = len(records) // 2
+        for sub_batch in [records[:mid], records[mid:]]:
+            try:
+                await _upsert(client, sub_batch)
+                queue.uploaded += len(sub_batch)
+            except Exception as sub_error:
+                print(f"  Sub-batch also failed: {str(sub_error)}")
+                queue.errors += len(sub_batch)
+    else:
+        # Try uploading one by one for small batches
+        for record in records:
+            try:
+                await _upsert(client, [record])
+                queue.uploaded += 1
+            except Exception as record_error:
+                print(f"  Error with record '{record['name_opt']}': {str(record_error)}")
+                queue.errors += 1
 
 
-def upload_to_supabase(df):
-    """Upload dataframe to Supabase dish_embeddings table"""
+async def _upload_worker(client, queue):
+    """Keep taking batches from the shared queue until it is empty"""
+    while True:
+        records = queue.next_batch()
+        if not records:
+            return
+        await _upload_batch(client, queue, records)
 
-    print("\nConnecting to Supabase...")
-    supabase = get_supabase_client()
+
+async def upload_to_supabase(df, embeddings, batch_size=DEFAULT_BATCH_SIZE,
+                             concurrency=DEFAULT_CONCURRENCY):
+    """Upload dataframe rows with their matching embedding matrix rows to the dish_embeddings table"""
 
     print("Preparing records for upload...")
-    batch_size = 500  # Increased from 100 to 500 for faster uploads
-    total_uploaded = 0
-    errors = 0
-
-    for i in range(0, len(df), batch_size):
-        batch = df.iloc[i:i+batch_size]
-
-        records = []
-        for _, row in batch.iterrows():
-            # Convert embedding to list if needed
-            embedding = row['embedding']
-            if isinstance(embedding, str):
-                embedding = eval(embedding)
-            elif isinstance(embedding, np.ndarray):
-                embedding = embedding.tolist()
-
-            records.append({
-                'name_opt': str(row['name_opt']),
-                'title': str(row['title']),
-                'description': str(row['description']) if pd.notna(row['description']) else '',
-                'type': str(row['type']) if pd.notna(row['type']) else 'food',
-                'embedding': embedding
-            })
-
-        # Upload batch
-        try:
-            import time
-            start_time = time.time()
-
-            response = supabase.table('dish_embeddings').upsert(
-                records,
-                on_conflict='name_opt'
-            ).execute()
-
-            total_uploaded += len(records)
-            elapsed = time.time() - start_time
-
-            batch_num = i//batch_size + 1
-            total_batches = (len(df)-1)//batch_size + 1
-
-            print(f"Uploaded batch {batch_num}/{total_batches} "
-                  f"({total_uploaded}/{len(df)} records) "
-                  f"- {elapsed:.1f}s")
-
-        except Exception as e:
-            print(f"Error uploading batch {i//batch_size + 1}: {str(e)}")
-
-            # For large batches, try splitting in half instead of one by one
-            if len(records) > 50:
-                print(f"  Retrying with smaller batches...")
-                mid = len(records) // 2
-                for sub_batch in [records[:mid], records[mid:]]:
-                    try:
-                        supabase.table('dish_embeddings').upsert(
-                            sub_batch,
-                            on_conflict='name_opt'
-                        ).execute()
-                        total_uploaded += len(sub_batch)
-                    except Exception as sub_error:
-                        print(f"  Sub-batch also failed: {str(sub_error)}")
-                        errors += len(sub_batch)
-            else:
-                # Try uploading one by one for small batches
-                for record in records:
-                    try:
-                        supabase.table('dish_embeddings').upsert(
-                            [record],
-                            on_conflict='name_opt'
-                        ).execute()
-                        total_uploaded += 1
-                    except Exception as record_error:
-                        print(f"  Error with record '{record['name_opt']}': {str(record_error)}")
-                        errors += 1
+    # Cast every column to a string dtype once, so rows need no per-field conversion
+    df = df.assign(
+        name_opt=df['name_opt'].astype('string').fillna(''),
+        title=df['title'].astype('string').fillna(''),
+        description=df['description'].astype('string').fillna(''),
+        type=df['type'].astype('string').fillna('food')
+    )
+
+    records = [
+        {'name_opt': name_opt, 'title': title, 'description': description, 'type': type_}
+        for name_opt, title, description, type_ in df[
+            ['name_opt', 'title', 'description', 'type']
+        ].itertuples(index=False, name=None)
+    ]
+    queue = _UploadQueue(records, embeddings, max(MIN_BATCH_SIZE, batch_size))
+
+    print(f"\nUploading in batches of up to {queue.batch_size} records "
+          f"({concurrency} concurrent)...")
+
+    async with create_supabase_rest_client() as client:
+        await asyncio.gather(*(_upload_worker(client, queue) for _ in range(concurrency)))
 
     print(f"\n{'='*60}")
     print(f"Upload Summary")
     print(f"{'='*60}")
     print(f"Total records:        {len(df)}")
-    print(f"Successfully uploaded: {total_uploaded}")
-    print(f"Errors:               {errors}")
+    print(f"Successfully uploaded: {queue.uploaded}")
+    print(f"Errors:               {queue.errors}")
     print(f"{'='*60}")
 
-    return errors == 0
+    return queue.errors == 0
 
 
 def main():
@@ -245,6 +372,23 @@ def main():
         default=DEFAULT_EMBEDDINGS_DIR,
         help=f'Path to embeddings directory (default: {DEFAULT_EMBEDDINGS_DIR})'
     )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f'Records per upsert request (default: {DEFAULT_BATCH_SIZE})'
+    )
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f'Upsert requests in flight at once (default: {DEFAULT_CONCURRENCY})'
+    )
+    parser.add_argument(
+        '--verbose',
+        action='store_true',
+        help='Print memory usage of the loaded metadata'
+    )
 
     args = parser.parse_args()
 
@@ -253,17 +397,21 @@ def main():
     print("=" * 60)
     print(f"CSV path:        {args.csv_path}")
     print(f"Embeddings dir:  {args.embeddings_dir}")
+    print(f"Batch size:      {args.batch_size}")
+    print(f"Concurrency:     {args.concurrency}")
     print("=" * 60)
 
     # Load data
-    df = load_embeddings_and_metadata(args.csv_path, args.embeddings_dir)
+    data = load_embeddings_and_metadata(args.csv_path, args.embeddings_dir, verbose=args.verbose)
 
-    if df is None:
+    if data is None:
         print("\n[ERROR] Failed to load data")
         return 1
 
+    df, embeddings = data
+
     # Upload to Supabase
-    success = upload_to_supabase(df)
+    success = asyncio.run(upload_to_supabase(df, embeddings, args.batch_size, args.concurrency))
 
     if success:
         print("\n[SUCCESS] All embeddings uploaded successfully!")
@@ -15,6 +15,7 @@ Example:
 import os
 import sys
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -27,17 +28,36 @@ from app.core.supabase_client import get_supabase_client
 load_dotenv()
 
 BUCKET_NAME = "dishes-photos"
-
-
-def upload_images(image_dir: Path, overwrite: bool = False):
+LIST_PAGE_SIZE = 1000
+DEFAULT_MAX_WORKERS = 10
+
+
+def list_bucket_files(bucket) -> set:
+    """Return the names of all files at the root of the bucket, paging through the listing"""
+    names = set()
+    offset = 0
+    while True:
+        page = bucket.list(
+            path="",
+            options={"limit": LIST_PAGE_SIZE, "offset": offset}
+        )
+        names.update(f.get("name") for f in page)
+        if len(page) < LIST_PAGE_SIZE:
+            return names
+        offset += len(page)
+
+
+def upload_images(image_dir: Path, overwrite: bool = False, max_workers: int = DEFAULT_MAX_WORKERS):
     """
     Upload all .jpg images from a directory to Supabase storage.
 
     Args:
         image_dir: Directory containing .jpg images
         overwrite: If True, overwrite existing files
+        max_workers: Number of uploads to run concurrently
     """
-    supabase = get_supabase_client()
+    # One storage handle for the bucket, shared by the listing and every upload
+    bucket = get_supabase_client().storage.from_(BUCKET_NAME)
 
     # Get all .jpg and .png files
     image_files = (
@@ -55,47 +75,56 @@ def upload_images(image_dir: Path, overwrite: bool = False):
     print(f"Uploading to Supabase bucket: {BUCKET_NAME}")
     print("-" * 60)
 
-    uploaded = 0
-    skipped = 0
-    errors = 0
+    # List the bucket once up front instead of once per image
+    existing_files = set()
+    if not overwrite:
+        try:
+            existing_files = list_bucket_files(bucket)
+            print(f"{len(existing_files)} files already in bucket")
+        except Exception as e:
+            print(f"Could not list existing files ({str(e)}), uploading all")
 
-    for image_path in image_files:
+    def upload_one(image_path: Path):
+        """Upload a single image. Returns (status, filename, error)."""
         filename = image_path.name
 
         try:
-            # Read file
-            with open(image_path, "rb") as f:
-                file_data = f.read()
-
             # Check if file already exists
-            if not overwrite:
-                try:
-                    existing = supabase.storage.from_(BUCKET_NAME).list(path="")
-                    file_exists = any(f.get("name") == filename for f in existing)
-
-                    if file_exists:
-                        print(f"[SKIP] {filename} (already exists)")
-                        skipped += 1
-                        continue
-                except:
-                    pass  # If list fails, try to upload anyway
+            if filename in existing_files:
+                return "skip", filename, None
 
             # Determine content type based on file extension
             content_type = "image/png" if filename.lower().endswith(".png") else "image/jpeg"
 
-            # Upload file
-            result = supabase.storage.from_(BUCKET_NAME).upload(
-                path=filename,
-                file=file_data,
-                file_options={"content-type": content_type, "upsert": overwrite}
-            )
-
-            print(f"[OK] {filename}")
-            uploaded += 1
+            # Upload straight from the open file so the image is streamed in
+            # chunks rather than held in memory by every worker
+            with open(image_path, "rb") as f:
+                bucket.upload(
+                    path=filename,
+                    file=f,
+                    file_options={"content-type": content_type, "upsert": overwrite}
+                )
+            return "ok", filename, None
 
         except Exception as e:
-            print(f"[ERROR] {filename}: {str(e)}")
-            errors += 1
+            return "error", filename, e
+
+    uploaded = 0
+    skipped = 0
+    errors = 0
+
+    # Uploads are network-bound, so several run at once on a small thread pool
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for status, filename, error in executor.map(upload_one, image_files):
+            if status == "ok":
+                print(f"[OK] {filename}")
+                uploaded += 1
+            elif status == "skip":
+                print(f"[SKIP] {filename} (already exists)")
+                skipped += 1
+            else:
+                print(f"[ERROR] {filename}: {str(error)}")
+                errors += 1
 
     print("-" * 60)
     print(f"Upload complete:")
@@ -158,6 +187,13 @@ Examples:
         help="Overwrite existing files in storage"
     )
 
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help=f"Number of concurrent uploads (default: {DEFAULT_MAX_WORKERS})"
+    )
+
     args = parser.parse_args()
 
     # Validate directory
@@ -178,7 +214,7 @@ Examples:
     print()
 
     # Upload images
-    upload_images(image_dir, overwrite=args.overwrite)
+    upload_images(image_dir, overwrite=args.overwrite, max_workers=args.max_workers)
 
 
 if __name__ == "__main__":
@@ -24,15 +24,27 @@ load_dotenv()
 
 BUCKET_NAME = "dishes-photos"
 
+# Rows per dishes or bucket listing page, and name_opt values per title lookup
+PAGE_SIZE = 1000
+TITLE_CHUNK_SIZE = 200
+
 
 def verify_images():
     """Check which dishes have images in storage."""
     supabase = get_supabase_client()
 
-    # Get all dishes from database
+    # Get all dishes from database (PostgREST caps each response, so page through)
     print("Fetching dishes from database...")
-    response = supabase.table("dishes").select("name_opt, title").execute()
-    dishes = response.data
+    dishes = []
+    offset = 0
+    while True:
+        response = supabase.table("dishes").select("name_opt").order("name_opt").range(
+            offset, offset + PAGE_SIZE - 1
+        ).execute()
+        dishes.extend(response.data)
+        if len(response.data) < PAGE_SIZE:
+            break
+        offset += PAGE_SIZE
 
     if not dishes:
         print("No dishes found in database")
@@ -44,8 +56,19 @@ def verify_images():
     # Get all files in storage bucket
     print(f"Checking storage bucket: {BUCKET_NAME}")
     try:
-        files_in_bucket = supabase.storage.from_(BUCKET_NAME).list(path="")
-        storage_filenames = {f.get("name") for f in files_in_bucket}
+        bucket = supabase.storage.from_(BUCKET_NAME)
+        storage_filenames = set()
+        offset = 0
+        while True:
+            # storage list() returns 100 entries unless a limit is given
+            files_in_bucket = bucket.list(
+                path="",
+                options={"limit": PAGE_SIZE, "offset": offset}
+            )
+            storage_filenames.update(f.get("name") for f in files_in_bucket)
+            if len(files_in_bucket) < PAGE_SIZE:
+                break
+            offset += len(files_in_bucket)
         print(f"Found {len(storage_filenames)} files in storage")
     except Exception as e:
         print(f"ERROR: Could not list files in bucket: {str(e)}")
@@ -57,25 +80,38 @@ def verify_images():
 
     # Check each dish
     found = 0
-    missing = 0
-    missing_dishes = []
+    missing_names = []
 
     for dish in dishes:
         name_opt = dish.get("name_opt", "")
-        title = dish.get("title", "")
         expected_filename = f"{name_opt}.jpg"
 
         if expected_filename in storage_filenames:
-            print(f"[OK] {expected_filename} - {title}")
+            print(f"[OK] {expected_filename}")
             found += 1
         else:
-            print(f"[MISSING] {expected_filename} - {title}")
-            missing += 1
-            missing_dishes.append({
-                "filename": expected_filename,
-                "name_opt": name_opt,
-                "title": title
-            })
+            missing_names.append(name_opt)
+
+    # Titles are only needed for the dishes without an image
+    titles = {}
+    for i in range(0, len(missing_names), TITLE_CHUNK_SIZE):
+        response = supabase.table("dishes").select("name_opt, title").in_(
+            "name_opt", missing_names[i:i + TITLE_CHUNK_SIZE]
+        ).execute()
+        titles.update((row["name_opt"], row.get("title", "")) for row in response.data)
+
+    missing = len(missing_names)
+    missing_dishes = [
+        {
+            "filename": f"{name_opt}.jpg",
+            "name_opt": name_opt,
+            "title": titles.get(name_opt, "")
+        }
+        for name_opt in missing_names
+    ]
+
+    for dish in missing_dishes:
+        print(f"[MISSING] {dish['filename']} - {dish['title']}")
 
     print("-" * 80)
     print()
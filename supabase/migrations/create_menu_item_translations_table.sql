@@ -0,0 +1,41 @@
+-- Pre-translated menu items, filled by OpenAI Batch API jobs
+CREATE TABLE IF NOT EXISTS menu_item_translations (
+    menu_item_id UUID NOT NULL REFERENCES menu_items(id) ON DELETE CASCADE,
+    language TEXT NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (menu_item_id, language)
+);
+
+CREATE INDEX IF NOT EXISTS idx_menu_item_translations_language ON menu_item_translations(language);
+
+-- Submitted translation batches, polled until OpenAI reports a final status
+CREATE TABLE IF NOT EXISTS translation_batches (
+    batch_id TEXT PRIMARY KEY,
+    menu_id UUID NOT NULL REFERENCES menus(id) ON DELETE CASCADE,
+    languages TEXT[] NOT NULL,
+    status TEXT NOT NULL,
+    processed BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_translation_batches_pending ON translation_batches(processed) WHERE processed = FALSE;
+
+-- Enable RLS
+ALTER TABLE menu_item_translations ENABLE ROW LEVEL SECURITY;
+ALTER TABLE translation_batches ENABLE ROW LEVEL SECURITY;
+
+-- Allow authenticated users to read translations
+CREATE POLICY "Allow authenticated read access" ON menu_item_translations
+    FOR SELECT USING (auth.role() = 'authenticated');
+
+-- Allow authenticated users to write translations and batch records
+CREATE POLICY "Allow authenticated insert" ON menu_item_translations
+    FOR INSERT WITH CHECK (auth.role() = 'authenticated');
+
+CREATE POLICY "Allow authenticated update" ON menu_item_translations
+    FOR UPDATE USING (auth.role() = 'authenticated');
+
+CREATE POLICY "Allow authenticated access" ON translation_batches
+    FOR ALL USING (auth.role() = 'authenticated');
@@ -0,0 +1,22 @@
+-- Shared cache of translated dish names, keyed by normalized name and target language
+CREATE TABLE IF NOT EXISTS translation_cache (
+    name_norm TEXT NOT NULL,
+    target_lang TEXT NOT NULL,
+    name_translated TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (name_norm, target_lang)
+);
+
+-- Enable RLS
+ALTER TABLE translation_cache ENABLE ROW LEVEL SECURITY;
+
+-- Allow authenticated users to read cached translations
+CREATE POLICY "Allow authenticated read access" ON translation_cache
+    FOR SELECT USING (auth.role() = 'authenticated');
+
+-- Allow authenticated users to add and refresh cached translations
+CREATE POLICY "Allow authenticated insert" ON translation_cache
+    FOR INSERT WITH CHECK (auth.role() = 'authenticated');
+
+CREATE POLICY "Allow authenticated update" ON translation_cache
+    FOR UPDATE USING (auth.role() = 'authenticated');
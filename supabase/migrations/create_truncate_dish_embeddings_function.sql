@@ -0,0 +1,14 @@
+-- Empty dish_embeddings in one statement (used before a full re-upload of embeddings)
+CREATE OR REPLACE FUNCTION truncate_dish_embeddings()
+RETURNS void
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    TRUNCATE TABLE dish_embeddings RESTART IDENTITY;
+$$;
+
+-- Only the backend's service role may call it
+REVOKE ALL ON FUNCTION truncate_dish_embeddings() FROM PUBLIC;
+REVOKE ALL ON FUNCTION truncate_dish_embeddings() FROM anon, authenticated;
+GRANT EXECUTE ON FUNCTION truncate_dish_embeddings() TO service_role;
@@ -27,11 +27,29 @@ def test_database_contents():
         # Search for common terms
         search_terms = ["salad", "salmon", "cake", "chocolate", "fish", "dessert"]
 
+        # One query for all terms, grouped per term below (only titles are selected,
+        # so no explicit limit; PostgREST's own row cap still applies)
+        response = supabase.table("dish_embeddings").select("title").or_(
+            ",".join(f"title.ilike.*{term}*" for term in search_terms)
+        ).execute()
+
+        matches = {term: [] for term in search_terms}
+        for item in response.data or []:
+            title = item["title"].lower()
+            for term in search_terms:
+                if term in title and len(matches[term]) < 5:
+                    matches[term].append(item)
+
+        # If the row cap was hit, common terms may have crowded others out; check those directly
+        for term in search_terms:
+            if not matches[term]:
+                response = supabase.table("dish_embeddings").select("title").ilike("title", f"%{term}%").limit(5).execute()
+                matches[term] = response.data or []
+
         for term in search_terms:
-            response = supabase.table("dish_embeddings").select("title").ilike("title", f"%{term}%").limit(5).execute()
-            if response.data:
-                print(f"Dishes containing '{term}': ({len(response.data)} shown)")
-                for item in response.data:
+            if matches[term]:
+                print(f"Dishes containing '{term}': ({len(matches[term])} shown)")
+                for item in matches[term]:
                     print(f"  - {item['title']}")
                 print()
             else:
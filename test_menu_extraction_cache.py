@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Check that only complete menu extractions are reused for repeat uploads of a photo"""
+
+import os
+import sys
+import asyncio
+
+# Add current directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from app.services import openai_service, translation_service
+
+ITEM = {"name": "Poulet Roti", "name_en": "Roast Chicken", "search_terms": ""}
+
+
+def _run_extractions(result, complete, image_hash):
+    """Extract the same image twice and return how many times OpenAI would have been called"""
+    calls = []
+
+    async def fake_extract(base64_image):
+        calls.append(base64_image)
+        return {"items": [dict(item) for item in result["items"]]}, complete
+
+    original = openai_service._extract_menu_items_uncached
+    openai_service._extract_menu_items_uncached = fake_extract
+    try:
+        for _ in range(2):
+            asyncio.run(openai_service.extract_menu_items("image", image_hash=image_hash))
+    finally:
+        openai_service._extract_menu_items_uncached = original
+    return len(calls)
+
+
+# The image hashes in these tests differ in far more than NEAR_DUPLICATE_DISTANCE bits
+def test_complete_extraction_is_reused():
+    assert _run_extractions({"items": [ITEM]}, True, "ffff0000") == 1
+
+
+def test_empty_extraction_is_not_cached():
+    assert _run_extractions({"items": []}, True, "0000ffff") == 2
+
+
+def test_degraded_translation_is_not_cached():
+    assert _run_extractions({"items": [ITEM]}, False, "ff00ff00") == 2
+
+
+def test_failed_english_translation_reports_failure():
+    async def failing_chat(**kwargs):
+        raise RuntimeError("OpenAI unavailable")
+
+    original = translation_service.cached_chat
+    translation_service.cached_chat = failing_chat
+    try:
+        results, success = asyncio.run(translation_service.translate_batch_to_english_for_search(
+            [{"id": 1, "name": "Poulet Roti", "description": None}]
+        ))
+    finally:
+        translation_service.cached_chat = original
+
+    assert not success
+    assert results[0]["name"] == "Poulet Roti"
+
+
+if __name__ == "__main__":
+    print("Testing menu extraction cache...")
+    print("-" * 50)
+
+    test_complete_extraction_is_reused()
+    test_empty_extraction_is_not_cached()
+    test_degraded_translation_is_not_cached()
+    test_failed_english_translation_reports_failure()
+
+    print("-" * 50)
+    print("✓ All tests passed!")
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Check that embedding uploads account for every record when batches time out"""
+
+import os
+import sys
+import asyncio
+
+import httpx
+import numpy as np
+import orjson
+
+# Add scripts directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+
+import upload_embeddings_from_prompts_meta as uploader
+
+# Batches larger than this time out, forcing nested shrinks
+TIMEOUT_ABOVE = 25
+TOTAL_RECORDS = 237
+
+
+def test_nested_timeouts_upload_every_record():
+    """Every record is either uploaded or counted as an error, even with nested timeouts"""
+    uploaded_names = []
+
+    def handler(request):
+        batch = orjson.loads(request.content)
+        if len(batch) > TIMEOUT_ABOVE:
+            raise httpx.ReadTimeout("timed out", request=request)
+        uploaded_names.extend(record["name_opt"] for record in batch)
+        return httpx.Response(201)
+
+    records = [
+        {"name_opt": f"n{i}", "title": f"t{i}", "description": "", "type": "food"}
+        for i in range(TOTAL_RECORDS)
+    ]
+    queue = uploader._UploadQueue(records, np.zeros((TOTAL_RECORDS, 4), dtype=np.float32), 100)
+
+    async def run():
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler), base_url="http://supabase.test"
+        ) as client:
+            await asyncio.gather(*(uploader._upload_worker(client, queue) for _ in range(8)))
+
+    asyncio.run(run())
+
+    assert queue.uploaded + queue.errors == len(records)
+    assert queue.errors == 0
+    assert sorted(uploaded_names) == sorted(record["name_opt"] for record in records)
+
+
+if __name__ == "__main__":
+    print("Testing embedding upload timeout handling...")
+    print("-" * 50)
+
+    test_nested_timeouts_upload_every_record()
+
+    print("-" * 50)
+    print("✓ All tests passed!")